@@ -0,0 +1,57 @@
+from typing import Callable, Hashable, List, Optional
+
+import pygame
+
+from engine.spatial import SpatialIndex
+
+
+class ActivationRegion:
+    """
+    The part of the world around the camera where entities are simulated.
+    Entities outside of it are asleep and aren't updated at all,
+    so the cost of the simulation depends on what's near the camera
+    instead of the size of the map
+    """
+
+    def __init__(
+        self,
+        index: SpatialIndex,
+        margin: int,
+        on_sleep: Optional[Callable[[Hashable], None]] = None,
+    ):
+        """
+        Parameters:
+            index: the entities, by the area they're in
+            margin: how far beyond the view entities are still awake
+            on_sleep: called with an entity when it falls asleep, so it can
+                      settle into a state it can be woken up in
+        """
+        self.index = index
+        self.margin = margin
+        self.on_sleep = on_sleep
+
+        self.area = pygame.Rect(0, 0, 0, 0)
+        self.awake: List[Hashable] = []
+
+    def update(self, view: pygame.Rect) -> List[Hashable]:
+        """
+        Moves the region to the view and puts the entities that left it to sleep
+
+        Returns:
+            The entities that are awake, in the order they were indexed
+        """
+        self.area = view.inflate(self.margin * 2, self.margin * 2)
+        awake = [
+            entity
+            for entity in self.index.query(self.area)
+            if self.index.rects[entity].colliderect(self.area)
+        ]
+
+        if self.on_sleep is not None:
+            still_awake = set(awake)
+            for entity in self.awake:
+                if entity not in still_awake:
+                    self.on_sleep(entity)
+
+        self.awake = awake
+        return awake
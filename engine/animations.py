@@ -1,11 +1,41 @@
-from typing import Sequence
+from typing import Sequence, Tuple
 
 import pygame
 
 from engine._types import Position
+from engine.asset_loader import asset_cache
+
+
+def get_frames(
+    assets: dict, name: str, flip: bool = False
+) -> Tuple[pygame.Surface, ...]:
+    """
+    Returns the frames of a sprite sheet asset, optionally flipped horizontally.
+    The flipped frames are kept by the asset cache for as long as the asset
+    is loaded, so every entity using the same asset shares them
+
+    Parameters:
+        assets: the assets the sprite sheet was loaded in
+        name: the name of the sprite sheet
+        flip: whether the frames should be mirrored
+    """
+    frames = assets[name]
+    if not flip:
+        return tuple(frames)
+
+    return asset_cache.derive(
+        name,
+        "flipped",
+        frames,
+        lambda frames: tuple(
+            pygame.transform.flip(frame, True, False) for frame in frames
+        ),
+    )
 
 
 class Animation:
+    __slots__ = ("frames", "speed", "f_len", "index", "animated_once")
+
     def __init__(
         self,
         frames: Sequence[pygame.Surface],
@@ -26,10 +56,11 @@ class Animation:
             self.index = 0
             self.animated_once = True
 
-    def draw(self, screen: pygame.Surface, pos: Position):
-        frame = self.frames[int(self.index)]
+    def get_frame(self) -> pygame.Surface:
+        return self.frames[int(self.index)]
 
-        screen.blit(frame, pos)
+    def draw(self, screen: pygame.Surface, pos: Position):
+        screen.blit(self.get_frame(), pos)
 
     def play(self, screen: pygame.Surface, pos: Position, dt: float):
         self.update(dt)
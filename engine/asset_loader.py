@@ -1,10 +1,39 @@
 import json
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict, defaultdict
 from pathlib import Path
-from typing import List, Sequence
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeAlias,
+)
 
 import pygame
 
-pygame.mixer.init()
+PACK_PATH = "assets/assets.pack"
+PACK_MAGIC = b"UBGPACK1"
+#                   magic, header length
+PACK_HEADER = struct.Struct("<8sI")
+
+#                       state     name      file  metadata
+Manifest: TypeAlias = Dict[str, Dict[str, Tuple[Path, dict]]]
+
+
+def init_mixer() -> None:
+    """
+    Starts the mixer, it's started when the first sound is loaded
+    """
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
 
 
 def get_images(
@@ -34,38 +63,341 @@ def get_images(
     return images
 
 
-def load_assets(state: str) -> dict:
-    assets = {}
-    path = Path("assets/loadable/")
+def load_asset(path: Path, data: dict) -> Any:
+    """
+    Loads a single asset
+
+    Parameters:
+        path: the path of the asset file
+        data: the asset's entry in its metadata.json
+    """
+    file_extension = path.suffix
+
+    if file_extension in (".png", ".jpg"):
+        if data["convert_alpha"]:
+            image = pygame.image.load(path).convert_alpha()
+        else:
+            image = pygame.image.load(path).convert()
+
+        asset = image
+
+        if data["sprite_sheet"] is not None:
+            asset = get_images(image, data["sprite_sheet"])
+
+    elif file_extension in (".mp3", ".wav"):
+        if not data["bgm"]:
+            asset = pygame.mixer.Sound(path)
+            asset.set_volume(data["volume"])
+        else:
+            asset = path
+
+    return asset
+
+
+def get_asset_size(asset: Any) -> int:
+    """
+    Roughly how many bytes an asset takes in memory
+    """
+    if isinstance(asset, (list, tuple)):
+        # sprite sheet frames share the pixels of the sheet,
+        # so every surface is only counted once
+        parents = {
+            id(frame.get_abs_parent()): frame.get_abs_parent() for frame in asset
+        }
+        return sum(get_asset_size(parent) for parent in parents.values())
+
+    if isinstance(asset, pygame.Surface):
+        return asset.get_pitch() * asset.get_height()
+    if isinstance(asset, pygame.mixer.Sound):
+        frequency, size, channels = pygame.mixer.get_init()
+        return int(asset.get_length() * frequency * channels * (abs(size) // 8))
+
+    # music is streamed from its file
+    return 0
 
-    json_files = path.rglob("*.json")
-    for metadata_f in json_files:
+
+def read_manifest(path: Path) -> Manifest:
+    """
+    Reads the metadata files in `path`
+
+    Returns:
+        The assets of every state
+    """
+    manifest = defaultdict(dict)
+    for metadata_f in path.rglob("*.json"):
         metadata = json.loads(metadata_f.read_text())
         for file, data in metadata.items():
-            if state not in data["states"]:
-                continue
+            name = file[: file.find(".")]
+            for state in data["states"]:
+                manifest[state][name] = (metadata_f.parent / file, data)
 
-            file_extension = file[file.find(".") :]
-            complete_path = metadata_f.parent / file
+    return manifest
 
-            if file_extension in (".png", ".jpg"):
-                if data["convert_alpha"]:
-                    image = pygame.image.load(complete_path).convert_alpha()
-                else:
-                    image = pygame.image.load(complete_path).convert()
 
-                asset = image
+class AssetPack:
+    """
+    Reads a pack built by engine.asset_pack, which holds the assets
+    already decoded. Surfaces and sounds are made straight from
+    the memory mapped file, so loading an asset doesn't decode anything
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            # copy on write, the surfaces' pixels have to be writable
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        self.buffer = memoryview(self.data)
+
+        magic, header_length = PACK_HEADER.unpack_from(self.data)
+        if magic != PACK_MAGIC:
+            raise ValueError(f"{path} isn't an asset pack")
+
+        header_end = PACK_HEADER.size + header_length
+        self.header = json.loads(bytes(self.buffer[PACK_HEADER.size : header_end]))
+        # the assets' offsets start after the header
+        self.data_start = header_end + -header_end % 16
+
+    @classmethod
+    def open(cls, path: str = PACK_PATH) -> Optional["AssetPack"]:
+        """
+        Returns the pack at `path`, or None if there's no pack
+        or the metadata files changed since it was built
+        """
+        if not os.path.exists(path):
+            return None
+
+        pack = cls(path)
+        for file, mtime in pack.header["metadata"].items():
+            if not os.path.exists(file) or os.stat(file).st_mtime_ns != mtime:
+                return None
+
+        return pack
+
+    def get_manifest(self) -> Manifest:
+        manifest = defaultdict(dict)
+        for name, entry in self.header["assets"].items():
+            for state in entry["data"]["states"]:
+                manifest[state][name] = (Path(entry["file"]), entry["data"])
+
+        return manifest
+
+    def is_fresh(self, name: str) -> bool:
+        """
+        Whether the packed asset is the same as its file
+        """
+        entry = self.header["assets"][name]
+        # samples can only be used if the mixer plays them in the same format
+        if entry["type"] == "sound" and pygame.mixer.get_init() != tuple(
+            self.header["mixer"]
+        ):
+            return False
+
+        try:
+            return os.stat(entry["file"]).st_mtime_ns == entry["mtime"]
+        except OSError:
+            return False
+
+    def load(self, name: str) -> Any:
+        entry = self.header["assets"][name]
+        data = entry["data"]
+        start = self.data_start + entry["offset"]
+        blob = self.buffer[start : start + entry["length"]]
+
+        if entry["type"] == "music":
+            return Path(entry["file"])
+
+        if entry["type"] == "sound":
+            sound = pygame.mixer.Sound(buffer=blob)
+            sound.set_volume(data["volume"])
+            return sound
 
-                if data["sprite_sheet"] is not None:
-                    asset = get_images(image, data["sprite_sheet"])
+        image = pygame.image.frombuffer(blob, entry["size"], "BGRA")
+        if not data["convert_alpha"]:
+            image = image.convert()
+        # the pixels are packed in the usual display format,
+        # so they normally don't need to be converted
+        elif image.get_masks() != get_display_alpha_masks():
+            image = image.convert_alpha()
 
-            elif file_extension in (".mp3", ".wav"):
-                if not data["bgm"]:
-                    asset = pygame.mixer.Sound(complete_path)
-                    asset.set_volume(data["volume"])
+        if entry["frames"] is not None:
+            return [image.subsurface(frame) for frame in entry["frames"]]
+
+        return image
+
+
+def get_display_alpha_masks() -> Tuple[int, int, int, int]:
+    return pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha().get_masks()
+
+
+class AssetCache:
+    """
+    Keeps assets loaded between states, so that switching states
+    doesn't reload the assets the states share.
+    States hold a reference to the assets they use, and assets no state uses
+    stay loaded until they take more than `unused_budget` bytes,
+    at which point the least recently used ones are unloaded.
+    Things made from an asset, see `derive`, are kept and unloaded with it.
+    Assets are loaded from the asset pack if there's an up to date one.
+    It can be used from several threads, see `preload`
+    """
+
+    def __init__(
+        self,
+        path: str = "assets/loadable/",
+        pack_path: str = PACK_PATH,
+        unused_budget: int = 64 * 1024 * 1024,
+    ):
+        self.path = Path(path)
+        self.pack_path = pack_path
+        self.pack: Optional[AssetPack] = None
+        self.unused_budget = unused_budget
+
+        self.manifest: Optional[Manifest] = None
+
+        self.assets: Dict[str, Any] = {}
+        # things made from the assets, by the asset they were made from
+        self.derived: Dict[str, Dict[Hashable, Any]] = {}
+        self.refcounts: Dict[str, int] = {}
+        # the sizes of assets that no state uses, least recently used first
+        self.unused: OrderedDict[str, int] = OrderedDict()
+        self.unused_size = 0
+
+        self.lock = threading.RLock()
+
+    def get_manifest(self) -> Manifest:
+        """
+        Returns the assets of every state, reading the pack
+        or the metadata files only once
+        """
+        with self.lock:
+            if self.manifest is None:
+                self.pack = AssetPack.open(self.pack_path)
+                if self.pack is not None:
+                    self.manifest = self.pack.get_manifest()
                 else:
-                    asset = complete_path
+                    self.manifest = read_manifest(self.path)
+
+            return self.manifest
+
+    def load(self, name: str, path: Path, data: dict) -> Any:
+        if path.suffix in (".mp3", ".wav"):
+            init_mixer()
+
+        if self.pack is not None and self.pack.is_fresh(name):
+            return self.pack.load(name)
+
+        return load_asset(path, data)
+
+    def get_size(self, name: str) -> int:
+        """
+        Roughly how many bytes an asset and the things made from it take
+        """
+        size = get_asset_size(self.assets[name])
+        for derived in self.derived.get(name, {}).values():
+            size += get_asset_size(derived)
+
+        return size
+
+    def derive(
+        self, name: str, key: Hashable, asset: Any, make: Callable[[Any], Any]
+    ) -> Any:
+        """
+        Returns something made from an asset, like its frames mirrored,
+        making it only once. It's unloaded together with the asset,
+        so an asset that gets reloaded is derived again
+
+        Parameters:
+            name: the name of the asset
+            key: tells apart the things made from the same asset
+            asset: the asset, as returned by `acquire`
+            make: makes the thing from the asset
+        """
+        with self.lock:
+            # assets that didn't come from the cache can't be kept track of
+            if self.assets.get(name) is not asset:
+                return make(asset)
+
+            derived = self.derived.setdefault(name, {})
+            if key not in derived:
+                derived[key] = make(asset)
+                if name in self.unused:
+                    size = get_asset_size(derived[key])
+                    self.unused[name] += size
+                    self.unused_size += size
 
-            assets[file.replace(file_extension, "")] = asset
+            return derived[key]
 
-    return assets
+    def preload(self, state: str) -> None:
+        """
+        Loads the assets of a state without acquiring them,
+        so that acquiring them later doesn't load anything.
+        Meant to be called from a worker thread, acquiring
+        the assets in the meantime waits for it to finish
+        """
+        with self.lock:
+            for name, (path, data) in self.get_manifest()[state].items():
+                if name in self.unused:
+                    self.unused.move_to_end(name)
+                elif name not in self.assets:
+                    self.assets[name] = self.load(name, path, data)
+                    self.unused[name] = self.get_size(name)
+                    self.unused_size += self.unused[name]
+
+    def acquire(self, state: str) -> dict:
+        """
+        Returns the assets of a state, loading the ones that aren't loaded yet.
+        They have to be given back with `release` when the state is done
+        """
+        with self.lock:
+            assets = {}
+            for name, (path, data) in self.get_manifest()[state].items():
+                if name in self.unused:
+                    self.unused_size -= self.unused.pop(name)
+                elif name not in self.assets:
+                    self.assets[name] = self.load(name, path, data)
+
+                self.refcounts[name] = self.refcounts.get(name, 0) + 1
+                assets[name] = self.assets[name]
+
+            return assets
+
+    def release(self, assets: dict) -> None:
+        """
+        Gives back assets returned by `acquire`
+        """
+        with self.lock:
+            for name in assets:
+                self.refcounts[name] -= 1
+                if not self.refcounts[name]:
+                    del self.refcounts[name]
+                    self.unused[name] = self.get_size(name)
+                    self.unused_size += self.unused[name]
+
+            while self.unused_size > self.unused_budget:
+                name, size = self.unused.popitem(last=False)
+                self.unused_size -= size
+                del self.assets[name]
+                self.derived.pop(name, None)
+
+
+asset_cache = AssetCache()
+
+
+def load_assets(state: str) -> dict:
+    """
+    Returns the assets of a state, see AssetCache.acquire
+    """
+    return asset_cache.acquire(state)
+
+
+def preload_assets(state: str) -> None:
+    """
+    Loads the assets of a state ahead of time, see AssetCache.preload
+    """
+    asset_cache.preload(state)
+
+
+def release_assets(assets: dict) -> None:
+    """
+    Gives back the assets of a state, see AssetCache.release
+    """
+    asset_cache.release(assets)
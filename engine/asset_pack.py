@@ -0,0 +1,103 @@
+"""
+Builds the asset pack read by engine.asset_loader.AssetPack,
+which has to be done again after changing the assets:
+
+    python -m engine.asset_pack
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pygame
+
+from engine.asset_loader import (
+    PACK_HEADER,
+    PACK_MAGIC,
+    PACK_PATH,
+    get_images,
+    init_mixer,
+    read_manifest,
+)
+
+
+def pad(length: int) -> int:
+    return -length % 16
+
+
+def build_pack(path: str = "assets/loadable/", pack_path: str = PACK_PATH) -> None:
+    """
+    Decodes the assets in `path` and writes them to a pack
+
+    Parameters:
+        path: the folder with the assets and their metadata files
+        pack_path: where to write the pack
+    """
+    init_mixer()
+
+    header = {
+        # sounds are stored as samples in this format
+        "mixer": pygame.mixer.get_init(),
+        "metadata": {
+            metadata_f.as_posix(): metadata_f.stat().st_mtime_ns
+            for metadata_f in Path(path).rglob("*.json")
+        },
+        "assets": {},
+    }
+
+    files = {}
+    for assets in read_manifest(Path(path)).values():
+        files |= assets
+
+    blobs = []
+    offset = 0
+    for name, (file, data) in files.items():
+        entry = {
+            "file": file.as_posix(),
+            "mtime": file.stat().st_mtime_ns,
+            "data": data,
+        }
+
+        if file.suffix in (".png", ".jpg"):
+            # stored like the display format's pixels
+            image = pygame.image.load(file)
+            blob = pygame.image.tobytes(image, "BGRA")
+
+            frames = None
+            if data["sprite_sheet"] is not None:
+                frames = [
+                    (*frame.get_offset(), *frame.get_size())
+                    for frame in get_images(image, data["sprite_sheet"])
+                ]
+            entry |= {"type": "image", "size": image.get_size(), "frames": frames}
+        elif data["bgm"]:
+            # music is streamed from its file
+            blob = b""
+            entry["type"] = "music"
+        else:
+            blob = pygame.mixer.Sound(file).get_raw()
+            entry["type"] = "sound"
+
+        entry |= {"offset": offset, "length": len(blob)}
+        header["assets"][name] = entry
+
+        blobs.append(blob + bytes(pad(len(blob))))
+        offset += len(blobs[-1])
+
+    header_json = json.dumps(header).encode()
+    header_end = PACK_HEADER.size + len(header_json)
+
+    # written next to the pack first, so a failed build doesn't break it
+    temp_path = f"{pack_path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(PACK_HEADER.pack(PACK_MAGIC, len(header_json)))
+        f.write(header_json)
+        f.write(bytes(pad(header_end)))
+        for blob in blobs:
+            f.write(blob)
+    os.replace(temp_path, pack_path)
+
+
+if __name__ == "__main__":
+    build_pack()
+    print(f"Built {PACK_PATH} ({os.path.getsize(PACK_PATH) / 1e6:.1f} MB)")
@@ -8,26 +8,77 @@ class ParallaxBackground:
         self,
         #                      layer           speed
         layers: Sequence[Tuple[pygame.Surface, float]],
+        cache_speed: float = 0.1,
     ):
+        """
+        Parameters:
+            layers: the layers and their speeds, from the bottom to the top
+            cache_speed: bottom layers up to this speed are composited together
+                         and only redrawn when one of them moves
+        """
         self.layers = layers
 
+        # each layer is stored twice side by side,
+        # so a wrapped layer only takes one blit
+        self.strips = [self.make_strip(layer) for layer, _ in layers]
+
+        self.cached_layers = 0
+        for _, speed in layers:
+            if speed > cache_speed:
+                break
+            self.cached_layers += 1
+
+        # if the bottom layer is opaque, so is the cache,
+        # which means drawing it also clears the screen
+        bottom = layers[0][0]
+        self.cache = pygame.Surface(
+            bottom.get_size(), bottom.get_flags() & pygame.SRCALPHA, bottom
+        )
+        self.cache_offsets = None
+
+    @staticmethod
+    def make_strip(layer: pygame.Surface) -> pygame.Surface:
+        width, height = layer.get_size()
+        strip = pygame.Surface(
+            (width * 2, height), layer.get_flags() & pygame.SRCALPHA, layer
+        )
+        strip.blit(layer, (0, 0))
+        strip.blit(layer, (width, 0))
+
+        return strip
+
+    def get_offset(
+        self, strip: pygame.Surface, scroll: pygame.Vector2, speed: float
+    ) -> int:
+        return int((-scroll[0] * speed) % (strip.get_width() // 2))
+
     def draw_layer(
         self,
         screen: pygame.Surface,
-        layer: pygame.Surface,
-        scroll: pygame.Vector2,
-        speed: float,
+        strip: pygame.Surface,
+        offset: int,
     ):
-        width = screen.get_width()
-        x = -scroll[0] * speed
+        width = strip.get_width() // 2
+        screen.blit(strip, (0, 0), (width - offset, 0, width, strip.get_height()))
+
+    def draw(self, screen: pygame.Surface, world_scroll: pygame.Vector2):
+        offsets = [
+            self.get_offset(strip, world_scroll, speed)
+            for strip, (_, speed) in zip(self.strips, self.layers)
+        ]
 
-        x %= width
+        if self.cached_layers:
+            cached_offsets = offsets[: self.cached_layers]
+            if cached_offsets != self.cache_offsets:
+                self.cache_offsets = cached_offsets
+                if self.cache.get_flags() & pygame.SRCALPHA:
+                    self.cache.fill((0, 0, 0, 0))
+                for strip, offset in zip(self.strips, cached_offsets):
+                    self.draw_layer(self.cache, strip, offset)
 
-        if abs(x) <= width:
-            screen.blit(layer, (x, 0))
-        if x != 0:
-            screen.blit(layer, (x - width, 0))
+            screen.blit(self.cache, (0, 0))
 
-    def draw(self, screen: pygame.Surface, world_scroll: pygame.Vector2):
-        for layer, speed in self.layers:
-            self.draw_layer(screen, layer, world_scroll, speed)
+        for strip, offset in zip(
+            self.strips[self.cached_layers :], offsets[self.cached_layers :]
+        ):
+            self.draw_layer(screen, strip, offset)
@@ -4,7 +4,7 @@ from typing import Dict, Sequence, Tuple
 import pygame
 
 from engine._types import Color, EventInfo, Position
-from src.common import FONT_PATH
+from engine.text import get_font
 
 
 class Button:
@@ -26,8 +26,7 @@ class Button:
         self.rect = pygame.Rect(pos, size)
 
         self.text = text
-        font = pygame.Font(FONT_PATH, 8)
-        self.text_surf = font.render(text, False, colors["text"])
+        self.text_surf = get_font().render(text, False, colors["text"])
         self.text_pos = self.text_surf.get_rect(center=self.rect.center).topleft
 
         self.border_radius = border_radius
@@ -36,6 +35,8 @@ class Button:
         self.clicked = False
         self.toggle = False
         self.hover_sound_played = False
+        # the state the button was last drawn with
+        self.drawn_state = None
 
         self.assets = assets
 
@@ -44,11 +45,10 @@ class Button:
         self.state = "static"
 
         if self.rect.collidepoint(event_info["mouse_pos"]):
-            for event in event_info["events"]:
-                if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
-                    self.clicked = True
-                    self.toggle = not self.toggle
-                    self.assets["button_high"].play()
+            if event_info["input"].clicked():
+                self.clicked = True
+                self.toggle = not self.toggle
+                self.assets["button_high"].play()
 
             self.state = "hover"
 
@@ -61,6 +61,8 @@ class Button:
             self.hover_sound_played = False
 
     def draw(self, screen: pygame.Surface) -> None:
+        self.drawn_state = self.state
+
         if self.border_radius is None:
             pygame.draw.rect(screen, self.colors[self.state], self.rect)
         else:
@@ -12,8 +12,14 @@ class Camera:
     def __init__(self, width: int, height: int):
         self.width = width
         self.height = height
+        # the scroll things are drawn with,
+        # which is in between the last two updates of the camera
         self.scroll = pygame.Vector2(0, -48)
+        self.previous_scroll = self.scroll.copy()
+        self.next_scroll = self.scroll.copy()
         self.screen_rect = pygame.Rect(self.scroll, (self.width, self.height))
+        # the part of the world that is currently visible
+        self.view_rect = pygame.Rect(self.scroll, (self.width, self.height))
 
     def apply(self, target_pos: Position) -> Position:
         """
@@ -29,6 +35,16 @@ class Camera:
         )
         return pos
 
+    def apply_rect(self, target_rect: pygame.Rect) -> pygame.Rect:
+        """
+        Adjusts the target rect to the current camera pos
+
+        Parameters:
+            target_rect: the target rect to adjust
+        """
+
+        return pygame.Rect(self.apply(target_rect.topleft), target_rect.size)
+
     def adjust_to(self, dt: float, target_pos: pygame.Rect) -> None:
         """
         Smoothly adjusts the camera pos to the target pos
@@ -38,13 +54,40 @@ class Camera:
             target_pos: the target position to adjust to
         """
 
-        self.scroll.x += (target_pos.x - self.scroll.x - self.width // 2) // 1
-        self.scroll.y += (
-            (target_pos.y - self.scroll.y - self.height // 1.5)
-        ) // 1  # * dt
+        self.previous_scroll.update(self.next_scroll)
+        scroll = self.next_scroll
+
+        scroll.x += (target_pos.x - scroll.x - self.width // 2) // 1
+        scroll.y += ((target_pos.y - scroll.y - self.height // 1.5)) // 1  # * dt
 
-        self.scroll.y = min(self.scroll.y, 128)
+        scroll.y = min(scroll.y, 128)
 
         # this just works i dunno why
-        self.screen_rect.center = self.apply(target_pos.topleft)
+        self.screen_rect.center = (
+            target_pos.x - scroll.x,
+            target_pos.y - scroll.y,
+        )
         self.screen_rect.y -= 24
+
+    def snap_to(self, target_pos: pygame.Rect) -> None:
+        """
+        Moves the camera to the target pos at once, without interpolating
+
+        Parameters:
+            target_pos: the target position to move to
+        """
+        self.adjust_to(0, target_pos)
+        self.previous_scroll.update(self.next_scroll)
+
+    def interpolate(self, alpha: float) -> None:
+        """
+        Moves the camera in between its last two positions, for drawing
+
+        Parameters:
+            alpha: 0 is the previous position, 1 is the latest one
+        """
+        # rounded, otherwise the tiles and entities would be
+        # truncated differently and jitter against each other
+        scroll = self.previous_scroll.lerp(self.next_scroll, alpha)
+        self.scroll.update(round(scroll.x), round(scroll.y))
+        self.view_rect.topleft = self.scroll
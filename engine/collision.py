@@ -0,0 +1,185 @@
+import math
+from typing import Optional, Tuple, Union
+
+import pygame
+
+from engine.map_compiler import EMPTY, ONE_WAY
+
+# how much of a one-way tile is solid, from its top
+ONE_WAY_HEIGHT = 2
+
+
+class CollisionGrid:
+    """
+    The collidable tiles of a map, one byte per tile.
+    Solid tiles block from every side, one-way tiles are only solid
+    in a strip ONE_WAY_HEIGHT pixels high at their top, which blocks
+    from every side too.
+    Moving a rect only looks at the tiles it moves through,
+    no matter how many tiles are around it
+    """
+
+    def __init__(
+        self,
+        cells: bytearray,
+        width: int,
+        height: int,
+        tilewidth: int,
+        tileheight: int,
+    ):
+        """
+        Parameters:
+            cells: EMPTY, SOLID or ONE_WAY for every tile, row by row
+            width: the width of the map, in tiles
+            height: the height of the map, in tiles
+            tilewidth: the width of a tile, in pixels
+            tileheight: the height of a tile, in pixels
+        """
+        self.cells = cells
+        self.width = width
+        self.height = height
+        self.tilewidth = tilewidth
+        self.tileheight = tileheight
+
+    def get(self, x: int, y: int) -> int:
+        """
+        Returns the tile at (x, y), tiles outside the map are empty
+        """
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.cells[y * self.width + x]
+
+        return EMPTY
+
+    def get_columns(self, rect: Union[pygame.Rect, pygame.FRect]) -> range:
+        return range(
+            math.floor(rect.left / self.tilewidth),
+            math.ceil(rect.right / self.tilewidth),
+        )
+
+    def get_rows(self, rect: Union[pygame.Rect, pygame.FRect]) -> range:
+        return range(
+            math.floor(rect.top / self.tileheight),
+            math.ceil(rect.bottom / self.tileheight),
+        )
+
+    def get_blocker(self, x: int, y: int) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Returns the solid part of the tile at (x, y) as (left, top, right, bottom),
+        or None if the tile is empty
+        """
+        tile = self.get(x, y)
+        if tile == EMPTY:
+            return None
+
+        left = x * self.tilewidth
+        top = y * self.tileheight
+        if tile == ONE_WAY:
+            return left, top, left + self.tilewidth, top + ONE_WAY_HEIGHT
+        return left, top, left + self.tilewidth, top + self.tileheight
+
+    def move_x(self, rect: pygame.FRect, dx: float) -> bool:
+        """
+        Moves a rect horizontally, stopping it at the first tile in the way
+
+        Parameters:
+            rect: the rect to move, it's moved in place
+            dx: how far to move, in pixels
+
+        Returns:
+            Whether a tile stopped the rect
+        """
+        if dx == 0:
+            return False
+
+        # the area the rect ends up in, and the one it moves through
+        if dx > 0:
+            start = min(rect.left + dx, rect.right)
+            end = rect.right + dx
+            columns = range(
+                math.floor(start / self.tilewidth),
+                math.ceil(end / self.tilewidth),
+            )
+        else:
+            start = rect.left + dx
+            end = max(rect.right + dx, rect.left)
+            columns = range(
+                math.ceil(end / self.tilewidth) - 1,
+                math.floor(start / self.tilewidth) - 1,
+                -1,
+            )
+
+        rows = self.get_rows(rect)
+        # the tiles of a column all have the same sides,
+        # so the first column with a tile in the way is the closest one
+        for x in columns:
+            for y in rows:
+                blocker = self.get_blocker(x, y)
+                if blocker is None:
+                    continue
+
+                left, top, right, bottom = blocker
+                if top < rect.bottom and bottom > rect.top:
+                    if dx > 0:
+                        rect.right = left
+                    else:
+                        rect.left = right
+                    return True
+
+        rect.x += dx
+        return False
+
+    def move_y(self, rect: pygame.FRect, dy: float) -> bool:
+        """
+        Moves a rect vertically, stopping it at the first tile in the way
+
+        Parameters:
+            rect: the rect to move, it's moved in place
+            dy: how far to move, in pixels
+
+        Returns:
+            Whether a tile stopped the rect
+        """
+        if dy == 0:
+            return False
+
+        # the area the rect ends up in, and the one it moves through
+        if dy > 0:
+            start = min(rect.top + dy, rect.bottom)
+            end = rect.bottom + dy
+            rows = range(
+                math.floor(start / self.tileheight),
+                math.ceil(end / self.tileheight),
+            )
+        else:
+            start = rect.top + dy
+            end = max(rect.bottom + dy, rect.top)
+            rows = range(
+                math.ceil(end / self.tileheight) - 1,
+                math.floor(start / self.tileheight) - 1,
+                -1,
+            )
+
+        columns = self.get_columns(rect)
+        # tiles in a row have the same top, and one-way tiles are solid
+        # at their top, so the first row with a tile in the way has the closest
+        for y in rows:
+            hit = None
+            for x in columns:
+                blocker = self.get_blocker(x, y)
+                if blocker is None:
+                    continue
+
+                left, top, right, bottom = blocker
+                # going up, a solid tile is closer than a one-way one
+                if top < end and bottom > start and (hit is None or bottom > hit[3]):
+                    hit = blocker
+
+            if hit is not None:
+                if dy > 0:
+                    rect.bottom = hit[1]
+                else:
+                    rect.top = hit[3]
+                return True
+
+        rect.y += dy
+        return False
@@ -0,0 +1,75 @@
+import itertools
+from typing import List, Sequence, Tuple
+
+import pygame
+
+from engine._types import Position
+
+
+class DrawList:
+    """
+    Collects surfaces to draw during a frame and draws them all at once.
+    Surfaces are drawn by layer (lowest first), and in the order they were
+    submitted within a layer
+    """
+
+    def __init__(self):
+        # every entry is a batch of surfaces, a single surface is a batch of one
+        self.entries: List[
+            Tuple[int, int, Sequence[Tuple[pygame.Surface, Position]]]
+        ] = []
+
+    def submit(
+        self,
+        surface: pygame.Surface,
+        pos: Position,
+        layer: int = 0,
+        special_flags: int = 0,
+    ) -> None:
+        """
+        Adds a surface to be drawn on the next flush
+
+        Parameters:
+            surface: the surface to draw
+            pos: where to draw it, in screen coordinates
+            layer: surfaces on higher layers are drawn on top
+            special_flags: blend flags, same as pygame.Surface.blit
+        """
+        self.entries.append((layer, special_flags, ((surface, pos),)))
+
+    def submit_many(
+        self,
+        blits: Sequence[Tuple[pygame.Surface, Position]],
+        layer: int = 0,
+        special_flags: int = 0,
+    ) -> None:
+        """
+        Adds several surfaces to be drawn on the next flush,
+        in the same layer and with the same blend flags.
+        They're kept as a single entry, so big batches don't slow down sorting
+
+        Parameters:
+            blits: the surfaces and where to draw them, in screen coordinates
+            layer: surfaces on higher layers are drawn on top
+            special_flags: blend flags, same as pygame.Surface.blit
+        """
+        self.entries.append((layer, special_flags, blits))
+
+    def flush(self, screen: pygame.Surface) -> None:
+        """
+        Draws everything that was submitted and clears the list.
+        Consecutive surfaces with the same blend flags are drawn
+        with a single fblits call
+        """
+        # sorting is stable, so the submission order is kept within a layer
+        self.entries.sort(key=lambda entry: entry[0])
+
+        for special_flags, entries in itertools.groupby(
+            self.entries, key=lambda entry: entry[1]
+        ):
+            screen.fblits(
+                itertools.chain.from_iterable(blits for *_, blits in entries),
+                special_flags,
+            )
+
+        self.entries.clear()
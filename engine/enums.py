@@ -13,3 +13,24 @@ class EntityStates(enum.Enum):
     WALK = "walk"
     JUMP = "jump"
     TALK = "talk"
+
+
+class Facing(enum.IntEnum):
+    # the sprite sheets face left, the right facing frames are flipped
+    LEFT = 0
+    RIGHT = 1
+
+
+class DrawLayers(enum.IntEnum):
+    NPC_BACKGROUND = enum.auto()
+    NPC = enum.auto()
+    NPC_TEXT = enum.auto()
+    PLAYER = enum.auto()
+    PARTICLES = enum.auto()
+    UI = enum.auto()
+
+
+class TriggerEvents(enum.Enum):
+    ENTER = enum.auto()
+    STAY = enum.auto()
+    EXIT = enum.auto()
@@ -0,0 +1,101 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Set, Union
+
+import pygame
+
+# an action's name or a key constant
+Control = Union[str, int]
+
+
+class Input:
+    """
+    The input of a frame, indexed once so that asking whether a key
+    or an action was pressed doesn't go through the frame's events.
+    Actions are names mapped to one or more keys, e.g. "jump" to space
+    """
+
+    def __init__(self, actions: Optional[Dict[str, Sequence[int]]] = None):
+        """
+        Parameters:
+            actions: the keys every action is bound to
+        """
+        self.actions: Dict[str, Sequence[int]] = {}
+        # the actions every key triggers, to index the events by action
+        self.key_actions: Dict[int, List[str]] = {}
+        for action, keys in (actions or {}).items():
+            self.bind(action, keys)
+
+        self.pressed_keys: Set[int] = set()
+        self.released_keys: Set[int] = set()
+        self.pressed_actions: Set[str] = set()
+        self.released_actions: Set[str] = set()
+        self.pressed_buttons: Set[int] = set()
+        self.released_buttons: Set[int] = set()
+        # nothing is held until the first update
+        self.held_keys: Sequence[bool] = defaultdict(bool)
+
+    def bind(self, action: str, keys: Sequence[int]) -> None:
+        """
+        Binds an action to keys, replacing the keys it was bound to
+        """
+        for key in self.actions.get(action, ()):
+            self.key_actions[key].remove(action)
+        self.actions[action] = tuple(keys)
+        for key in self.actions[action]:
+            self.key_actions.setdefault(key, []).append(action)
+
+    def update(self, events: Sequence[pygame.Event]) -> None:
+        """
+        Indexes the events of a frame, forgetting the ones of the last frame
+        """
+        self.pressed_keys.clear()
+        self.released_keys.clear()
+        self.pressed_actions.clear()
+        self.released_actions.clear()
+        self.pressed_buttons.clear()
+        self.released_buttons.clear()
+
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                self.pressed_keys.add(event.key)
+                self.pressed_actions.update(self.key_actions.get(event.key, ()))
+            elif event.type == pygame.KEYUP:
+                self.released_keys.add(event.key)
+                self.released_actions.update(self.key_actions.get(event.key, ()))
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                self.pressed_buttons.add(event.button)
+            elif event.type == pygame.MOUSEBUTTONUP:
+                self.released_buttons.add(event.button)
+
+        self.held_keys = pygame.key.get_pressed()
+
+    def pressed(self, control: Control) -> bool:
+        """
+        Returns whether the key or action was pressed this frame
+        """
+        if isinstance(control, str):
+            return control in self.pressed_actions
+        return control in self.pressed_keys
+
+    def released(self, control: Control) -> bool:
+        """
+        Returns whether the key or action was released this frame
+        """
+        if isinstance(control, str):
+            return control in self.released_actions
+        return control in self.released_keys
+
+    def held(self, control: Control) -> bool:
+        """
+        Returns whether the key, or any of the action's keys, is held down
+        """
+        if isinstance(control, str):
+            return any(self.held_keys[key] for key in self.actions[control])
+        return self.held_keys[control]
+
+    def clicked(self, button: int = 1) -> bool:
+        """
+        Returns whether the mouse button was released this frame,
+        1 is the left button
+        """
+        return button in self.released_buttons
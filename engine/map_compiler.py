@@ -0,0 +1,247 @@
+"""
+Compiles TMX maps into a cache file that loads without parsing the TMX.
+The cache holds the tile layers' gids, the tile properties, the collision
+grid, the object layers and the tile images, and is rebuilt whenever
+the map, its tilesets or their images change
+"""
+
+import json
+import os
+import struct
+import xml.etree.ElementTree as ET
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import pygame
+
+MAP_MAGIC = b"UBGMAP01"
+#                  magic, header length
+MAP_HEADER = struct.Struct("<8sI")
+
+# values of the collision grid
+EMPTY = 0
+SOLID = 1
+ONE_WAY = 2
+
+# how many tiles are in a row of the tile image atlas
+ATLAS_COLUMNS = 32
+
+
+def get_cache_path(map_path: Union[str, Path]) -> Path:
+    return Path(map_path).with_suffix(".tmxc")
+
+
+def get_sources(map_path: Path) -> List[Path]:
+    """
+    Returns the files a map is made from: the map, its tilesets and their images
+    """
+    sources = [map_path]
+    for tileset in ET.parse(map_path).getroot().iter("tileset"):
+        tileset_path = map_path.parent / tileset.attrib["source"]
+        sources.append(tileset_path)
+        for image in ET.parse(tileset_path).getroot().iter("image"):
+            sources.append(tileset_path.parent / image.attrib["source"])
+
+    return sources
+
+
+def is_json_value(value) -> bool:
+    return isinstance(value, (bool, int, float, str))
+
+
+def compile_map(map_path: Union[str, Path], cache_path: Union[str, Path]) -> None:
+    """
+    Parses a TMX map with pytmx and writes its cache file
+
+    Parameters:
+        map_path: the TMX map
+        cache_path: where to write the cache
+    """
+    # pytmx is only needed when the cache is rebuilt
+    import pytmx
+
+    map_path = Path(map_path)
+    tilemap = pytmx.load_pygame(str(map_path))
+    size = tilemap.width * tilemap.height
+
+    header = {
+        "sources": {
+            source.as_posix(): source.stat().st_mtime_ns
+            for source in get_sources(map_path)
+        },
+        "width": tilemap.width,
+        "height": tilemap.height,
+        "tilewidth": tilemap.tilewidth,
+        "tileheight": tilemap.tileheight,
+        "layers": [],
+        "properties": {},
+        "tiles": {},
+        "objects": {},
+    }
+    blobs = []
+
+    collision = bytearray(size)
+    used_gids = set()
+    for layer in tilemap.visible_layers:
+        if isinstance(layer, pytmx.TiledObjectGroup):
+            header["objects"][layer.name] = [
+                {
+                    "name": obj.name,
+                    "type": obj.type,
+                    "x": obj.x,
+                    "y": obj.y,
+                    "width": obj.width,
+                    "height": obj.height,
+                    "properties": {
+                        key: value
+                        for key, value in obj.properties.items()
+                        if is_json_value(value)
+                    },
+                }
+                for obj in layer
+            ]
+            continue
+
+        if not isinstance(layer, pytmx.TiledTileLayer):
+            continue
+
+        gids = array("H", (gid for row in layer.data for gid in row))
+        header["layers"].append(layer.name)
+        blobs.append(gids.tobytes())
+        used_gids.update(gids)
+
+        for i, gid in enumerate(gids):
+            props = tilemap.get_tile_properties_by_gid(gid)
+            if props is not None and props["collidable"]:
+                collision[i] = ONE_WAY if props["invisible"] else SOLID
+
+    blobs.append(bytes(collision))
+
+    # only the tiles that can be drawn go in the atlas
+    tile_images = {}
+    for gid in sorted(used_gids):
+        props = tilemap.get_tile_properties_by_gid(gid)
+        if props is None:
+            continue
+
+        header["properties"][gid] = {
+            key: value for key, value in props.items() if is_json_value(value)
+        }
+        image = tilemap.get_tile_image_by_gid(gid)
+        if image is not None:
+            tile_images[gid] = image
+
+    atlas = None
+    if tile_images:
+        cell_w = max(image.get_width() for image in tile_images.values())
+        cell_h = max(image.get_height() for image in tile_images.values())
+        rows = -(-len(tile_images) // ATLAS_COLUMNS)
+        atlas = pygame.Surface((cell_w * ATLAS_COLUMNS, cell_h * rows), pygame.SRCALPHA)
+        for i, (gid, image) in enumerate(tile_images.items()):
+            pos = (i % ATLAS_COLUMNS * cell_w, i // ATLAS_COLUMNS * cell_h)
+            atlas.blit(image, pos)
+            header["tiles"][gid] = (*pos, *image.get_size())
+
+        header["atlas_size"] = atlas.get_size()
+        blobs.append(pygame.image.tobytes(atlas, "BGRA"))
+
+    header_json = json.dumps(header).encode()
+
+    # written next to the cache first, so a failed build doesn't break it
+    temp_path = f"{cache_path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(MAP_HEADER.pack(MAP_MAGIC, len(header_json)))
+        f.write(header_json)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(temp_path, cache_path)
+
+
+def read_cache(cache_path: Path) -> Optional[dict]:
+    """
+    Reads a map's cache file
+
+    Returns:
+        The map's data, or None if the cache is missing, out of date or corrupt
+    """
+    try:
+        data = cache_path.read_bytes()
+    except OSError:
+        return None
+
+    # a truncated or corrupt cache is rebuilt instead of crashing the game
+    try:
+        return parse_cache(data)
+    except (struct.error, ValueError, KeyError, TypeError):
+        return None
+
+
+def parse_cache(data: bytes) -> Optional[dict]:
+    """
+    Parses the contents of a map's cache file, see read_cache
+
+    Raises:
+        struct.error, ValueError, KeyError or TypeError if the data is corrupt
+    """
+    magic, header_length = MAP_HEADER.unpack_from(data)
+    if magic != MAP_MAGIC:
+        return None
+
+    start = MAP_HEADER.size + header_length
+    header = json.loads(data[MAP_HEADER.size : start])
+    for source, mtime in header["sources"].items():
+        if not os.path.exists(source) or os.stat(source).st_mtime_ns != mtime:
+            return None
+
+    size = header["width"] * header["height"]
+    # the layers, the collision grid and the atlas' pixels
+    length = start + size * 2 * len(header["layers"]) + size
+    if "atlas_size" in header:
+        atlas_width, atlas_height = header["atlas_size"]
+        length += atlas_width * atlas_height * 4
+    if len(data) != length:
+        raise ValueError("the map cache has the wrong length")
+
+    layers: Dict[str, array] = {}
+    for name in header["layers"]:
+        layers[name] = array("H")
+        layers[name].frombytes(data[start : start + size * 2])
+        start += size * 2
+
+    collision = bytearray(data[start : start + size])
+    start += size
+
+    images = {}
+    if "atlas_size" in header:
+        atlas = pygame.image.frombuffer(data[start:], header["atlas_size"], "BGRA")
+        images = {
+            int(gid): atlas.subsurface(rect) for gid, rect in header["tiles"].items()
+        }
+
+    return {
+        "width": header["width"],
+        "height": header["height"],
+        "tilewidth": header["tilewidth"],
+        "tileheight": header["tileheight"],
+        "layers": layers,
+        "properties": {int(gid): props for gid, props in header["properties"].items()},
+        "images": images,
+        "collision": collision,
+        "objects": header["objects"],
+    }
+
+
+def load_map(map_path: Union[str, Path]) -> dict:
+    """
+    Returns a map's data from its cache, compiling the map first
+    if the cache is out of date. See read_cache for what the data holds
+    """
+    cache_path = get_cache_path(map_path)
+
+    data = read_cache(cache_path)
+    if data is None:
+        compile_map(map_path, cache_path)
+        data = read_cache(cache_path)
+
+    return data
@@ -0,0 +1,111 @@
+from typing import Dict, Optional
+
+import pygame
+
+
+class Music:
+    """
+    Plays songs made of stems, versions of the song that play in sync on
+    their own channels. Switching between stems is a crossfade,
+    so the song never has to be reloaded or seeked
+    """
+
+    def __init__(self, fade_speed: float = 0.2):
+        """
+        Parameters:
+            fade_speed: how much a stem's volume changes per unit of deltatime
+        """
+        self.fade_speed = fade_speed
+
+        self.stems: Dict[str, pygame.mixer.Sound] = {}
+        self.channels: Dict[str, pygame.mixer.Channel] = {}
+        self.volumes: Dict[str, float] = {}
+        self.target_volumes: Dict[str, float] = {}
+        self.fading_out = False
+
+    def is_playing(self, stems: Dict[str, pygame.mixer.Sound]) -> bool:
+        return (
+            stems == self.stems
+            and not self.fading_out
+            and any(channel.get_busy() for channel in self.channels.values())
+        )
+
+    def play(
+        self,
+        stems: Dict[str, pygame.mixer.Sound],
+        volumes: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """
+        Starts looping a song from the beginning,
+        unless it's already playing, in which case it just keeps playing
+
+        Parameters:
+            stems: the song's stems by name
+            volumes: the volumes of the stems, stems that aren't in it are muted
+        """
+        if not self.is_playing(stems):
+            self.stop()
+
+            # the channels are reserved so sound effects can't take them
+            pygame.mixer.set_reserved(len(stems))
+            self.stems = stems
+            self.channels = {
+                name: pygame.mixer.Channel(i) for i, name in enumerate(stems)
+            }
+            self.volumes = dict.fromkeys(stems, 0.0)
+            self.target_volumes = dict.fromkeys(stems, 0.0)
+            self.fading_out = False
+
+            for name, stem in stems.items():
+                self.channels[name].set_volume(0)
+                self.channels[name].play(stem, -1)
+
+        if volumes is not None:
+            self.mix(volumes)
+            # a new song doesn't fade in
+            self.volumes = self.target_volumes.copy()
+            self.apply_volumes()
+
+    def mix(self, volumes: Dict[str, float]) -> None:
+        """
+        Crossfades the stems to new volumes
+
+        Parameters:
+            volumes: the volumes of the stems, stems that aren't in it are muted
+        """
+        self.target_volumes = {name: volumes.get(name, 0.0) for name in self.stems}
+
+    def apply_volumes(self) -> None:
+        for name, channel in self.channels.items():
+            channel.set_volume(self.volumes[name])
+
+    def update(self, dt: float) -> None:
+        if self.volumes == self.target_volumes:
+            return
+
+        for name, target in self.target_volumes.items():
+            volume = self.volumes[name]
+            if volume < target:
+                self.volumes[name] = min(target, volume + self.fade_speed * dt)
+            else:
+                self.volumes[name] = max(target, volume - self.fade_speed * dt)
+
+        self.apply_volumes()
+
+    def fadeout(self, time: int) -> None:
+        """
+        Fades the song out and stops it
+
+        Parameters:
+            time: how long the fade takes, in milliseconds
+        """
+        self.fading_out = True
+        for channel in self.channels.values():
+            channel.fadeout(time)
+
+    def stop(self) -> None:
+        for channel in self.channels.values():
+            channel.stop()
+
+
+music = Music()
@@ -1,30 +1,158 @@
+from typing import List, Optional, Sequence, TypeAlias, Union
+
+import numpy as np
 import pygame
 
 from engine._types import Position
-from engine.camera import Camera
+from engine.draw_list import DrawList
+
+ArrayLike: TypeAlias = Union[float, Sequence, np.ndarray]
+
 
+class ParticlePool:
+    """
+    A fixed number of particles that move and fade out, stored in arrays.
+    All of them are updated at once, dead particles' slots are reused
+    by new ones, and the images are never copied or changed while playing,
+    so thousands of particles cost about as much as a few
+    """
+
+    # how many alpha values an image is pre-rendered with
+    ALPHA_LEVELS = 32
 
-class FadingOutText:
     def __init__(
         self,
-        image: pygame.Surface,
-        pos: Position,
-        alpha_speed: int,
-        starting_alpha: int = 255,
-        lifespan: int = 0,
+        images: Sequence[pygame.Surface],
+        capacity: int,
+        gravity: float = 0,
     ):
-        self.image = image
-        self.alpha = starting_alpha
-        self.pos = pygame.Vector2(pos)
-        self.alpha_speed = alpha_speed
-        self.alive = True
+        """
+        Parameters:
+            images: the images particles can have, particles refer to them by index
+            capacity: the most particles that can be alive at once,
+                      new particles are dropped while the pool is full
+            gravity: how much the particles accelerate downwards
+        """
+        self.images = list(images)
+        self.capacity = capacity
+        self.gravity = gravity
+
+        # every image with every alpha level, in a flat list,
+        # the variant of image i with alpha level l is at i * ALPHA_LEVELS + l
+        self.variants: List[pygame.Surface] = []
+        for image in self.images:
+            for level in range(self.ALPHA_LEVELS):
+                variant = image.copy()
+                variant.set_alpha(round(level * 255 / (self.ALPHA_LEVELS - 1)))
+                self.variants.append(variant)
+        self.sizes = np.array([image.get_size() for image in self.images]).reshape(
+            -1, 2
+        )
+
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.alpha = np.zeros(capacity)
+        self.alpha_speed = np.zeros(capacity)
+        self.image = np.zeros(capacity, int)
+        self.alive = np.zeros(capacity, bool)
+
+    def __len__(self) -> int:
+        """
+        The number of particles that are alive
+        """
+        return int(np.count_nonzero(self.alive))
+
+    def emit(
+        self,
+        pos: ArrayLike,
+        vel: ArrayLike = (0, 0),
+        image: ArrayLike = 0,
+        alpha: ArrayLike = 255,
+        alpha_speed: ArrayLike = 1,
+    ) -> int:
+        """
+        Adds particles, every parameter is either one value
+        for all of them or one value per particle
+
+        Parameters:
+            pos: where the particles start, their top left corners
+            vel: how fast the particles move
+            image: the indices of the particles' images
+            alpha: the alpha the particles start with
+            alpha_speed: how fast the particles fade out
+
+        Returns:
+            How many particles were added, which is less than asked
+            if the pool ran out of space
+        """
+        pos = np.atleast_2d(pos)
+        vel = np.atleast_2d(vel)
+        count = max(len(pos), len(vel), np.size(image), np.size(alpha))
+        count = max(count, np.size(alpha_speed))
+
+        slots = np.flatnonzero(~self.alive)[:count]
+        emitted = len(slots)
+
+        self.pos[slots] = np.broadcast_to(pos, (count, 2))[:emitted]
+        self.vel[slots] = np.broadcast_to(vel, (count, 2))[:emitted]
+        self.image[slots] = np.broadcast_to(image, count)[:emitted]
+        self.alpha[slots] = np.broadcast_to(alpha, count)[:emitted]
+        self.alpha_speed[slots] = np.broadcast_to(alpha_speed, count)[:emitted]
+        self.alive[slots] = True
+
+        return emitted
+
+    def clear(self) -> None:
+        self.alive[:] = False
+
+    def update(self, dt: float) -> None:
+        if not self.alive.any():
+            return
+
+        # dead particles are updated too, it's cheaper than picking the alive ones
+        self.vel[:, 1] += self.gravity * dt
+        self.pos += self.vel * dt
+        self.alpha -= self.alpha_speed * dt
+        self.alive &= self.alpha > 0
+
+    def get_bounding_rect(self, offset: Position = (0, 0)) -> Optional[pygame.Rect]:
+        """
+        Returns the area all the alive particles are in, or None if there are none
+
+        Parameters:
+            offset: subtracted from the particles' positions, like a camera scroll
+        """
+        alive = np.flatnonzero(self.alive)
+        if not len(alive):
+            return None
+
+        pos = self.pos[alive] - np.asarray(offset, float)
+        topleft = np.floor(pos.min(axis=0))
+        bottomright = np.ceil((pos + self.sizes[self.image[alive]]).max(axis=0))
+
+        return pygame.Rect(topleft.tolist(), (bottomright - topleft).tolist())
+
+    def draw(
+        self, draw_list: DrawList, layer: int = 0, offset: Position = (0, 0)
+    ) -> None:
+        """
+        Submits the alive particles to the draw list in one go
 
-    def update(self, delta_time: float):
-        self.alpha -= self.alpha_speed * delta_time
-        self.image.set_alpha(self.alpha)
+        Parameters:
+            draw_list: where to draw the particles
+            layer: the layer of the particles
+            offset: subtracted from the particles' positions, like a camera scroll
+        """
+        alive = np.flatnonzero(self.alive)
+        if not len(alive):
+            return
 
-        if self.alpha <= 0:
-            self.alive = False
+        levels = np.ceil(self.alpha[alive] * (self.ALPHA_LEVELS - 1) / 255)
+        levels = np.clip(levels, 0, self.ALPHA_LEVELS - 1).astype(int)
+        variants = (self.image[alive] * self.ALPHA_LEVELS + levels).tolist()
+        positions = self.pos[alive] - np.asarray(offset, float)
+        positions = np.round(positions).astype(int).tolist()
 
-    def draw(self, screen: pygame.Surface):
-        screen.blit(self.image, self.pos)
+        draw_list.submit_many(
+            list(zip([self.variants[i] for i in variants], positions)), layer
+        )
@@ -0,0 +1,49 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable
+
+
+class Prefetcher:
+    """
+    Runs loading work on worker threads ahead of time,
+    so that it's ready by the time it's needed.
+    Each result is handed out once, by `get`
+    """
+
+    def __init__(self, workers: int = 2):
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="prefetch")
+        self.futures: Dict[Hashable, Future] = {}
+
+    def submit(self, key: Hashable, func: Callable, *args) -> None:
+        """
+        Starts calling `func(*args)` on a worker thread,
+        unless work with the same key is already running
+
+        Parameters:
+            key: identifies the result for `get`
+            func: the function that loads the result
+        """
+        if key in self.futures and not self.futures[key].done():
+            return
+
+        self.futures[key] = self.pool.submit(func, *args)
+
+    def get(self, key: Hashable, func: Callable, *args) -> Any:
+        """
+        Returns the result prefetched with `key`, waiting for it if it's
+        still loading. If nothing was prefetched, `func(*args)` is called instead
+        """
+        future = self.futures.pop(key, None)
+        if future is None:
+            return func(*args)
+
+        return future.result()
+
+    def shutdown(self) -> None:
+        """
+        Cancels the work that hasn't started and waits for the rest
+        """
+        self.pool.shutdown(cancel_futures=True)
+        self.futures.clear()
+
+
+prefetcher = Prefetcher()
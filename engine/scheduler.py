@@ -0,0 +1,126 @@
+import time
+from typing import Callable, Dict, List, Optional
+
+import pygame
+
+from engine._types import EventInfo
+
+UpdateCallback = Callable[[EventInfo], None]
+DrawCallback = Callable[[pygame.Surface, EventInfo], None]
+
+
+class System:
+    __slots__ = (
+        "name",
+        "order",
+        "update",
+        "draw",
+        "update_enabled",
+        "draw_enabled",
+        "update_time",
+        "draw_time",
+        "updates",
+        "draws",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        order: int,
+        update: Optional[UpdateCallback],
+        draw: Optional[DrawCallback],
+    ):
+        self.name = name
+        self.order = order
+        self.update = update
+        self.draw = draw
+        self.update_enabled = True
+        self.draw_enabled = True
+
+        # how long the callbacks took in total, in seconds, and how often they ran
+        self.update_time = 0.0
+        self.draw_time = 0.0
+        self.updates = 0
+        self.draws = 0
+
+
+class Scheduler:
+    """
+    Runs the update and draw callbacks of a state's systems in a fixed order.
+    Systems can be turned off on their own, and every callback is timed,
+    see report
+    """
+
+    def __init__(self):
+        self.systems: Dict[str, System] = {}
+        # the systems by order, the ones with the same order by when they were added
+        self.ordered: List[System] = []
+
+    def add(
+        self,
+        name: str,
+        order: int,
+        update: Optional[UpdateCallback] = None,
+        draw: Optional[DrawCallback] = None,
+    ) -> None:
+        """
+        Adds a system
+
+        Parameters:
+            name: the name of the system, used to turn it on and off
+            order: systems with a lower order update and draw first
+            update: called with the event info on every update
+            draw: called with the screen and the event info on every draw
+        """
+        system = System(name, order, update, draw)
+        self.systems[name] = system
+        self.ordered.append(system)
+        self.ordered.sort(key=lambda system: system.order)
+
+    def set_enabled(
+        self,
+        name: str,
+        update: Optional[bool] = None,
+        draw: Optional[bool] = None,
+    ) -> None:
+        """
+        Turns the update and draw callbacks of a system on or off,
+        None leaves them as they are
+        """
+        system = self.systems[name]
+        if update is not None:
+            system.update_enabled = update
+        if draw is not None:
+            system.draw_enabled = draw
+
+    def update(self, event_info: EventInfo) -> None:
+        for system in self.ordered:
+            if system.update is None or not system.update_enabled:
+                continue
+
+            start = time.perf_counter()
+            system.update(event_info)
+            system.update_time += time.perf_counter() - start
+            system.updates += 1
+
+    def draw(self, screen: pygame.Surface, event_info: EventInfo) -> None:
+        for system in self.ordered:
+            if system.draw is None or not system.draw_enabled:
+                continue
+
+            start = time.perf_counter()
+            system.draw(screen, event_info)
+            system.draw_time += time.perf_counter() - start
+            system.draws += 1
+
+    def report(self) -> str:
+        """
+        Returns how long every system's callbacks took on average
+        """
+        lines = [f"{'system':<16}{'update':>12}{'draw':>12}"]
+        for system in self.ordered:
+            update = system.update_time / max(system.updates, 1) * 1000
+            draw = system.draw_time / max(system.draws, 1) * 1000
+            lines.append(f"{system.name:<16}{update:9.3f} ms{draw:9.3f} ms")
+
+        return "\n".join(lines)
@@ -0,0 +1,72 @@
+import itertools
+from collections import defaultdict
+from typing import Dict, Hashable, List, Set, Union
+
+import pygame
+
+
+class SpatialIndex:
+    """
+    Buckets objects by the columns of the world they overlap,
+    so that objects near an area can be found without checking all of them
+    """
+
+    def __init__(self, column_width: int):
+        self.column_width = column_width
+        self.columns: Dict[int, Set[Hashable]] = defaultdict(set)
+        self.rects: Dict[Hashable, pygame.Rect] = {}
+        # query results are sorted by insertion order, so they don't
+        # depend on set ordering (which also decides the drawing order)
+        self.order: Dict[Hashable, int] = {}
+        self.counter = itertools.count()
+
+    def get_columns(self, rect: Union[pygame.Rect, pygame.FRect]) -> range:
+        first = int(rect.left // self.column_width)
+        last = int((rect.right - 1) // self.column_width)
+
+        return range(first, max(first, last) + 1)
+
+    def insert(self, obj: Hashable, rect: Union[pygame.Rect, pygame.FRect]) -> None:
+        """
+        Adds an object to the index
+
+        Parameters:
+            obj: the object to add
+            rect: the area of the world the object is in
+        """
+        self.rects[obj] = rect.copy()
+        self.order.setdefault(obj, next(self.counter))
+        for column in self.get_columns(rect):
+            self.columns[column].add(obj)
+
+    def remove(self, obj: Hashable) -> None:
+        rect = self.rects.pop(obj)
+        del self.order[obj]
+        for column in self.get_columns(rect):
+            self.columns[column].discard(obj)
+
+    def move(self, obj: Hashable, rect: Union[pygame.Rect, pygame.FRect]) -> None:
+        """
+        Updates the area of an object that is already in the index
+        """
+        if self.get_columns(rect) == self.get_columns(self.rects[obj]):
+            self.rects[obj] = rect.copy()
+            return
+
+        for column in self.get_columns(self.rects[obj]):
+            self.columns[column].discard(obj)
+        self.rects[obj] = rect.copy()
+        for column in self.get_columns(rect):
+            self.columns[column].add(obj)
+
+    def query(self, rect: Union[pygame.Rect, pygame.FRect]) -> List[Hashable]:
+        """
+        Returns the objects in the columns `rect` overlaps, in insertion order.
+        The objects aren't guaranteed to collide with `rect`
+        """
+        found = set()
+        for column in self.get_columns(rect):
+            if column in self.columns:
+                found |= self.columns[column]
+
+        return sorted(found, key=self.order.__getitem__)
@@ -0,0 +1,127 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def write_atomic(path: str, text: str) -> None:
+    """
+    Writes a file so that it has either its old or its new contents,
+    even if the process is killed while writing
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class JSONStore:
+    """
+    Keeps JSON files in memory, so each file is only read once.
+    Saving only updates the memory, the files are written by a background
+    thread a bit later, which lets several saves of a file become one write.
+    Files that couldn't be written are logged, and `flush` raises for them
+    """
+
+    def __init__(self, delay: float = 0.5):
+        """
+        Parameters:
+            delay: how long the writer waits for more saves, in seconds
+        """
+        self.delay = delay
+
+        self.data: Dict[str, Any] = {}
+        # the text of the files that have to be written
+        self.pending: Dict[str, str] = {}
+        self.writing = False
+        self.flushing = False
+        # why the files that couldn't be written failed, until they're written
+        self.errors: Dict[str, OSError] = {}
+
+        self.condition = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+
+    def load(self, path: str) -> Any:
+        """
+        Returns a copy of a file's data, which is only read the first time
+        """
+        with self.condition:
+            if path not in self.data:
+                with open(path, "r") as f:
+                    self.data[path] = json.loads(f.read())
+
+            return copy.deepcopy(self.data[path])
+
+    def save(self, path: str, data: Any) -> None:
+        """
+        Replaces a file's data, the file is written in the background
+        """
+        with self.condition:
+            self.data[path] = copy.deepcopy(data)
+            self.pending[path] = json.dumps(data, indent=4)
+
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.write_pending, name="store", daemon=True
+                )
+                self.thread.start()
+                # the last saves are written even if the game doesn't quit cleanly
+                atexit.register(self.flush)
+            self.condition.notify_all()
+
+    def write_pending(self) -> None:
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending)
+                # more saves can come in the meantime, they're written together
+                self.condition.wait_for(lambda: self.flushing, self.delay)
+
+                pending = self.pending
+                self.pending = {}
+                self.writing = True
+
+            errors = {}
+            for path, text in pending.items():
+                try:
+                    write_atomic(path, text)
+                except OSError as error:
+                    logger.error("Couldn't save %s: %s", path, error)
+                    errors[path] = error
+
+            with self.condition:
+                for path in pending:
+                    self.errors.pop(path, None)
+                self.errors.update(errors)
+                self.writing = False
+                self.condition.notify_all()
+
+    def flush(self) -> None:
+        """
+        Waits until every save is written
+
+        Raises:
+            OSError if some files couldn't be written, the saves of those files
+            are still kept in memory
+        """
+        with self.condition:
+            self.flushing = True
+            self.condition.notify_all()
+            self.condition.wait_for(lambda: not self.pending and not self.writing)
+            self.flushing = False
+
+            errors = self.errors
+            self.errors = {}
+
+        if errors:
+            paths = ", ".join(errors)
+            raise OSError(f"Couldn't save {paths}") from next(iter(errors.values()))
+
+
+store = JSONStore()
@@ -0,0 +1,214 @@
+from typing import Dict, List, Tuple
+
+import pygame
+
+from engine._types import Color
+from src.common import FONT_PATH
+
+_fonts: Dict[Tuple[str, int], pygame.Font] = {}
+_atlases: Dict[tuple, "GlyphAtlas"] = {}
+
+
+def get_font(path: str = FONT_PATH, size: int = 8) -> pygame.Font:
+    """
+    Returns the font with the given path and size,
+    loading it only the first time it's requested
+    """
+    key = (path, size)
+    if key not in _fonts:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        _fonts[key] = pygame.Font(path, size)
+
+    return _fonts[key]
+
+
+def get_atlas(
+    font: pygame.Font, color: Color, outline_color: Color = "black", width: int = 1
+) -> "GlyphAtlas":
+    """
+    Returns the glyph atlas for the given font and colors,
+    creating it only the first time it's requested
+    """
+    key = (font, str(pygame.Color(color)), str(pygame.Color(outline_color)), width)
+    if key not in _atlases:
+        _atlases[key] = GlyphAtlas(font, color, outline_color, width)
+
+    return _atlases[key]
+
+
+class GlyphAtlas:
+    """
+    Renders outlined text by putting together pre-rendered glyphs,
+    which is a lot faster than rendering the text with the font every time.
+    The layout matches pygame.Font.render with a wraplength
+    """
+
+    # glyphs that are rendered up front, others are added when first used
+    PRELOADED = "".join(chr(i) for i in range(32, 127)) + "\n"
+    WHITESPACE = " \t\n"
+
+    def __init__(
+        self,
+        font: pygame.Font,
+        color: Color,
+        outline_color: Color = "black",
+        width: int = 1,
+    ):
+        self.font = font
+        self.color = color
+        self.outline_color = outline_color
+        self.width = width
+
+        self.line_size = font.get_linesize()
+
+        #                          outline          fill            advance
+        self.glyphs: Dict[str, Tuple[pygame.Surface, pygame.Surface, int]] = {}
+        self.add_glyphs(self.PRELOADED)
+
+    def add_glyphs(self, chars: str) -> None:
+        """
+        Renders the glyphs of `chars` to a new atlas surface
+        """
+        chars = "".join(dict.fromkeys(c for c in chars if c not in self.glyphs))
+        if not chars:
+            return
+
+        fills = [self.font.render(c, False, self.color) for c in chars]
+        outlines = [self.font.render(c, False, self.outline_color) for c in chars]
+
+        # every glyph takes a cell with room for the outline,
+        # outlines are on the first row and fills on the second
+        cell_w = max(fill.get_width() for fill in fills) + self.width * 2
+        cell_h = max(fill.get_height() for fill in fills) + self.width * 2
+        atlas = pygame.Surface((cell_w * len(chars), cell_h * 2), pygame.SRCALPHA)
+
+        offsets = (
+            (0, self.width),
+            (self.width, 0),
+            (self.width * 2, self.width),
+            (self.width, self.width * 2),
+        )
+        for i, (char, fill, outline) in enumerate(zip(chars, fills, outlines)):
+            size = (
+                fill.get_width() + self.width * 2,
+                fill.get_height() + self.width * 2,
+            )
+            outline_cell = atlas.subsurface((i * cell_w, 0), size)
+            fill_cell = atlas.subsurface((i * cell_w, cell_h), size)
+
+            for point in offsets:
+                outline_cell.blit(outline, point)
+            fill_cell.blit(fill, (self.width, self.width))
+
+            self.glyphs[char] = (outline_cell, fill_cell, fill.get_width())
+
+    def get_height(self, line: str) -> int:
+        """
+        The height pygame gives a rendered line, which depends on its glyphs
+        """
+        return self.font.size(line)[1] if line else self.font.get_height()
+
+    def wrap(self, text: str, wraplength: int) -> List[str]:
+        """
+        Splits the text into lines that fit in `wraplength` pixels,
+        breaking at newlines and whitespace like pygame.Font.render does
+
+        Returns:
+            The lines, each with the whitespace it was broken at
+        """
+        lines = []
+        start = 0
+        while start < len(text):
+            # find how many characters fit
+            fit = 0
+            width = 0
+            for char in text[start:]:
+                width += self.glyphs[char][2]
+                if wraplength > 0 and width > wraplength:
+                    break
+                fit += 1
+            fit = max(fit, 1)
+
+            # break at a newline or at the last whitespace that fits
+            end = start
+            last_whitespace = None
+            while end < len(text):
+                char = text[end]
+                end += 1
+                if char in self.WHITESPACE:
+                    last_whitespace = end
+                    if char == "\n":
+                        break
+                if end - start == fit:
+                    break
+
+            if last_whitespace is not None and end < len(text):
+                end = last_whitespace
+
+            lines.append(text[start:end])
+            start = end
+
+        return lines or [""]
+
+    def get_width(self, line: str) -> int:
+        return sum(self.glyphs[char][2] for char in line)
+
+    def render(
+        self, text: str, wraplength: int = 196, align: int = pygame.FONT_LEFT
+    ) -> Tuple[pygame.Surface, pygame.Surface]:
+        """
+        Renders outlined text
+
+        Parameters:
+            text: the text to render
+            wraplength: the maximum width of a line, 0 disables wrapping
+            align: pygame.FONT_LEFT, pygame.FONT_CENTER or pygame.FONT_RIGHT
+
+        Returns:
+            The rendered text and a darkener of the same size
+        """
+        self.add_glyphs(text)
+
+        lines = self.wrap(text, wraplength)
+        widths = [self.get_width(line) for line in lines]
+        # newlines count towards the size of the surface, but not alignment
+        align_widths = [self.get_width(line.rstrip("\n")) for line in lines]
+
+        # like pygame, only left aligned single lines are shrunk to fit
+        if wraplength > 0 and (len(lines) > 1 or align != pygame.FONT_LEFT):
+            text_width = wraplength
+        else:
+            text_width = max(widths)
+        text_height = self.line_size * (len(lines) - 1) + max(
+            self.get_height(line) for line in lines
+        )
+
+        master_surf = pygame.Surface(
+            (text_width + self.width * 2, text_height + self.width * 2),
+            pygame.SRCALPHA,
+        )
+        darkener = pygame.Surface(master_surf.get_size())
+        darkener.set_alpha(150)
+
+        outlines = []
+        fills = []
+        for i, (line, line_width) in enumerate(zip(lines, align_widths)):
+            x = 0
+            if align == pygame.FONT_CENTER:
+                x = (text_width - line_width + 1) // 2
+            elif align == pygame.FONT_RIGHT:
+                x = text_width - line_width
+            y = i * self.line_size
+
+            for char in line.rstrip("\n"):
+                outline, fill, advance = self.glyphs[char]
+                outlines.append((outline, (x, y)))
+                fills.append((fill, (x, y)))
+                x += advance
+
+        # all the outlines go under all the text, like in render_outline_text
+        master_surf.fblits(outlines)
+        master_surf.fblits(fills)
+
+        return master_surf, darkener
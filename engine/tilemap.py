@@ -1,79 +1,132 @@
 import pathlib
 import typing
-from typing import Optional, Sequence, Union
+from typing import Dict, List, NamedTuple, Optional, Sequence, Union
 
 import pygame
-import pytmx
 
+from engine.camera import Camera
+from engine.collision import CollisionGrid
+from engine.map_compiler import load_map
 
-class TileLayerMap:
+
+class MapObject(NamedTuple):
     """
-    Adds some functions like render_map and make_map to enhance pytmx's tilemap
+    An object of one of the map's object layers
     """
 
-    def __init__(self, map_path: Union[str, pathlib.Path]):
-        def overwritten_get_layer_by_name(name: str):
-            try:
-                return self.tilemap.layernames[name]
-            except KeyError:
-                return ()
+    name: Optional[str]
+    type: Optional[str]
+    x: float
+    y: float
+    width: float
+    height: float
+    properties: dict
 
-        self.tilemap = pytmx.load_pygame(str(map_path))
 
-        self.tilemap.get_layer_by_name = overwritten_get_layer_by_name
+class TileLayerMap:
+    """
+    A tilemap loaded from a compiled TMX map, see engine.map_compiler.
+    Adds some functions like render_map and make_map
+    """
 
-        self.width = self.tilemap.width * self.tilemap.tilewidth
-        self.height = self.tilemap.height * self.tilemap.tileheight
+    # size of a pre-rendered map chunk, in tiles
+    CHUNK_SIZE = 16
 
-        # Tiles will be filled in on render_map
-        self.tiles = {}
+    def __init__(self, map_path: Union[str, pathlib.Path]):
+        data = load_map(map_path)
+
+        # the size of the map and of its tiles, in tiles and pixels
+        self.map_width = data["width"]
+        self.map_height = data["height"]
+        self.tilewidth = data["tilewidth"]
+        self.tileheight = data["tileheight"]
+
+        # gids of the visible tile layers, row by row
+        self.layers: Dict[str, typing.Sequence[int]] = data["layers"]
+        self.tile_properties: Dict[int, dict] = data["properties"]
+        self.images: Dict[int, pygame.Surface] = data["images"]
+        self.objects: Dict[str, List[MapObject]] = {
+            name: [MapObject(**obj) for obj in objects]
+            for name, objects in data["objects"].items()
+        }
+
+        self.width = self.map_width * self.tilewidth
+        self.height = self.map_height * self.tileheight
+
+        self.chunk_width = self.CHUNK_SIZE * self.tilewidth
+        self.chunk_height = self.CHUNK_SIZE * self.tileheight
+        # chunks are rendered the first time they come into view,
+        # empty chunks are stored as None so they're never blitted
+        self.chunks = {}
+
+        self.collision_grid = CollisionGrid(
+            data["collision"],
+            self.map_width,
+            self.map_height,
+            self.tilewidth,
+            self.tileheight,
+        )
+
+    def get_objects(self, layer_name: str) -> List[MapObject]:
+        """
+        Returns the objects of an object layer, or nothing if there's no such layer
+        """
+        return self.objects.get(layer_name, [])
 
     def render_map(
-        self, surface: pygame.Surface, tilset: Optional[Sequence] = None
-    ) -> None:
+        self,
+        surface: pygame.Surface,
+        tilset: Optional[Sequence] = None,
+        area: Optional[pygame.Rect] = None,
+    ) -> bool:
         """
         Renders the map to a given surface
 
         Parameters:
             surface: pygame.Surface to blit on
+            tilset: optional images to use instead of the map's tilesets
+            area: the part of the map to render, in tiles.
+                  It is rendered relative to the surface's topleft
+
+        Returns:
+            Whether any tile was rendered
         """
 
-        for layer_id, layer in enumerate(self.tilemap.visible_layers):
-            if isinstance(layer, pytmx.TiledTileLayer):
-                for x, y, gid in layer:
+        map_area = pygame.Rect(0, 0, self.map_width, self.map_height)
+        area = map_area if area is None else area.clip(map_area)
+
+        blits = []
+        for gids in self.layers.values():
+            for y in range(area.top, area.bottom):
+                row = y * self.map_width
+                for x in range(area.left, area.right):
+                    gid = gids[row + x]
                     # Gets tile properties
-                    tile_props = self.tilemap.get_tile_properties_by_gid(gid)
+                    tile_props = self.tile_properties.get(gid)
                     if tile_props is None:
                         continue
 
                     if tilset is None:
-                        tile_img = self.tilemap.get_tile_image_by_gid(gid)
+                        tile_img = self.images.get(gid)
                     else:
                         tile_img = tilset[tile_props["id"]]
-                    tile_instance = None
+                    if tile_img is None:
+                        continue
 
-                    # Blit the tile image to surface
-                    surface.blit(
-                        tile_img,
-                        (x * self.tilemap.tilewidth, y * self.tilemap.tileheight),
+                    blits.append(
+                        (
+                            tile_img,
+                            (
+                                (x - area.left) * self.tilewidth,
+                                (y - area.top) * self.tileheight,
+                            ),
+                        )
                     )
 
-                    # Construct appropriate instance based on tile type
-                    if tile_props["collidable"] and not tile_props["invisible"]:
-                        tile_instance = pygame.Rect(
-                            (x * self.tilemap.tilewidth, y * self.tilemap.tileheight),
-                            (self.tilemap.tilewidth, self.tilemap.tileheight),
-                        )
-                        # Add tile instance to self.regular_tiles
-                        self.tiles[(x, y)] = tile_instance
+        # layers are in order, so blitting them all at once keeps the overlap
+        surface.fblits(blits)
 
-                    elif tile_props["collidable"] and tile_props["invisible"]:
-                        tile_instance = pygame.Rect(
-                            (x * self.tilemap.tilewidth, y * self.tilemap.tileheight),
-                            (self.tilemap.tilewidth, 2),
-                        )
-                        # Add tile instance to self.invisible_tiles
-                        self.tiles[(x, y)] = tile_instance
+        return bool(blits)
 
     def make_map(self, tileset: Optional[Sequence] = None) -> pygame.Surface:
         """
@@ -86,3 +139,71 @@ class TileLayerMap:
         temp_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
         self.render_map(temp_surface, tileset)
         return temp_surface
+
+    def get_chunk(self, chunk_pos: typing.Tuple[int, int]) -> Optional[pygame.Surface]:
+        """
+        Returns the rendered chunk at `chunk_pos`, rendering it if needed
+
+        Parameters:
+            chunk_pos: The chunk position, in chunks
+
+        Returns:
+            The chunk's surface, or None if the chunk has no tiles
+        """
+
+        try:
+            return self.chunks[chunk_pos]
+        except KeyError:
+            pass
+
+        chunk_x, chunk_y = chunk_pos
+        rect = pygame.Rect(
+            chunk_x * self.chunk_width,
+            chunk_y * self.chunk_height,
+            self.chunk_width,
+            self.chunk_height,
+        ).clip(0, 0, self.width, self.height)
+
+        chunk = pygame.Surface(rect.size, pygame.SRCALPHA)
+        area = pygame.Rect(
+            chunk_x * self.CHUNK_SIZE,
+            chunk_y * self.CHUNK_SIZE,
+            self.CHUNK_SIZE,
+            self.CHUNK_SIZE,
+        )
+        if not self.render_map(chunk, area=area):
+            chunk = None
+
+        self.chunks[chunk_pos] = chunk
+        return chunk
+
+    def draw(self, screen: pygame.Surface, camera: Camera) -> None:
+        """
+        Blits the chunks that are visible by the camera
+
+        Parameters:
+            screen: pygame.Surface to blit on
+            camera: the camera that decides what's visible
+        """
+
+        view = camera.view_rect.clip(0, 0, self.width, self.height)
+        if not view:
+            return
+
+        first_x = view.left // self.chunk_width
+        last_x = (view.right - 1) // self.chunk_width
+        first_y = view.top // self.chunk_height
+        last_y = (view.bottom - 1) // self.chunk_height
+
+        for chunk_y in range(first_y, last_y + 1):
+            for chunk_x in range(first_x, last_x + 1):
+                chunk = self.get_chunk((chunk_x, chunk_y))
+                if chunk is None:
+                    continue
+
+                screen.blit(
+                    chunk,
+                    camera.apply(
+                        (chunk_x * self.chunk_width, chunk_y * self.chunk_height)
+                    ),
+                )
@@ -0,0 +1,34 @@
+import time
+from typing import List, Optional, Tuple
+
+
+class StartupTrace:
+    """
+    Measures how long each phase of the startup takes
+    """
+
+    def __init__(self, start: Optional[float] = None):
+        """
+        Parameters:
+            start: when the startup began, from time.perf_counter
+        """
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        #                       phase seconds
+        self.phases: List[Tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        """
+        Ends a phase, which started when the last one ended
+        """
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self) -> str:
+        lines = [
+            f"{phase:<16}{seconds * 1000:8.1f} ms" for phase, seconds in self.phases
+        ]
+        lines.append(f"{'total':<16}{(self.last - self.start) * 1000:8.1f} ms")
+
+        return "\n".join(lines)
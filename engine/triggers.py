@@ -0,0 +1,98 @@
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Union
+
+import pygame
+
+from engine.enums import TriggerEvents
+from engine.spatial import SpatialIndex
+from engine.tilemap import MapObject
+
+
+class Trigger:
+    def __init__(self, type: str, rect: pygame.Rect, target: Any = None):
+        """
+        Parameters:
+            type: decides which handlers are called
+            rect: the area of the world the trigger covers
+            target: what the trigger belongs to, like a map object or an NPC
+        """
+        self.type = type
+        self.rect = rect
+        self.target = target
+
+
+class TriggerSystem:
+    """
+    Areas of the world that react to a rect entering them, staying in them
+    and leaving them. Triggers are kept in a SpatialIndex, so checking
+    the rect costs a single query no matter how many triggers there are
+    """
+
+    def __init__(self, column_width: int):
+        self.index = SpatialIndex(column_width)
+        self.handlers: Dict[
+            Tuple[str, TriggerEvents], List[Callable[[Trigger], None]]
+        ] = defaultdict(list)
+        # the triggers the rect was in after the last update
+        self.inside: List[Trigger] = []
+
+    def add(self, type: str, rect: pygame.Rect, target: Any = None) -> Trigger:
+        trigger = Trigger(type, rect, target)
+        self.index.insert(trigger, rect)
+
+        return trigger
+
+    def add_objects(self, objects: Sequence[MapObject]) -> None:
+        """
+        Adds a trigger for every map object, the object's type is the trigger's
+        """
+        for obj in objects:
+            rect = pygame.Rect(obj.x, obj.y, obj.width, obj.height)
+            self.add(obj.type, rect, obj)
+
+    def remove(self, trigger: Trigger) -> None:
+        self.index.remove(trigger)
+        if trigger in self.inside:
+            self.inside.remove(trigger)
+
+    def on(
+        self, type: str, event: TriggerEvents, handler: Callable[[Trigger], None]
+    ) -> None:
+        """
+        Calls `handler` with the trigger whenever `event` happens
+        to a trigger of the given type
+
+        Parameters:
+            type: the type of the triggers
+            event: ENTER when the rect starts overlapping a trigger,
+                   STAY on every update the rect overlaps it (including the
+                   first one) and EXIT when the rect stops overlapping it
+            handler: the function to call
+        """
+        self.handlers[(type, event)].append(handler)
+
+    def dispatch(self, trigger: Trigger, event: TriggerEvents) -> None:
+        for handler in self.handlers.get((trigger.type, event), ()):
+            handler(trigger)
+
+    def update(self, rect: Union[pygame.Rect, pygame.FRect]) -> None:
+        """
+        Finds the triggers `rect` overlaps and calls the handlers
+        of the ones it entered, stayed in and left
+        """
+        inside = [
+            trigger
+            for trigger in self.index.query(rect)
+            if trigger.rect.colliderect(rect)
+        ]
+        previous = self.inside
+        self.inside = inside
+
+        for trigger in previous:
+            if trigger not in inside:
+                self.dispatch(trigger, TriggerEvents.EXIT)
+
+        for trigger in inside:
+            if trigger not in previous:
+                self.dispatch(trigger, TriggerEvents.ENTER)
+            self.dispatch(trigger, TriggerEvents.STAY)
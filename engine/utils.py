@@ -1,74 +1,19 @@
-from typing import Union
-
 import pygame
 
-from engine._types import Position
-from engine.animations import Animation
-from engine.tilemap import TileLayerMap
-from src.common import TILE_SIZE
-
-
-def render_outline_text(text: str, font: pygame.Font, color, wraplength=196, width=1):
-    rendered_text = font.render(text, False, color, wraplength=wraplength)
-    outline = font.render(text, False, "black", wraplength=wraplength)
-
-    master_surf = pygame.Surface(
-        (rendered_text.get_width() + width * 2, rendered_text.get_height() + width * 2),
-        pygame.SRCALPHA,
-    )
-    darkener = pygame.Surface(master_surf.get_size())
-    darkener.set_alpha(150)
-    offsets = (
-        (0, width),
-        (width, 0),
-        (width * 2, width),
-        (width, width * 2),
-    )
-    for point in offsets:
-        master_surf.blit(outline, point)
-    master_surf.blit(rendered_text, (width, width))
-
-    return master_surf, darkener
+from engine.text import get_atlas
 
 
-def reverse_animation(anim: Animation):
-    """Reverse frames in a given Animation"""
+def render_outline_text(
+    text: str,
+    font: pygame.Font,
+    color,
+    wraplength=196,
+    width=1,
+    align=pygame.FONT_LEFT,
+):
+    """Renders text with a black outline, using the font's glyph atlas"""
 
-    new_frames = [pygame.transform.flip(frame, True, False) for frame in anim.frames]
-
-    return Animation(new_frames, anim.speed)
-
-
-def get_neighboring_tiles(tilemap: TileLayerMap, radius: int, tile_pos: pygame.Vector2):
-    """
-    Gets the nearest `radius` tiles from `tile_pos`
-
-    Parameters:
-        tilemap: The tilemap class to extract the information
-        radius: The desired radius of tiles to include
-        tile_pos: The tile position
-    """
-    neighboring_tile_entities = []
-
-    for x in range(int(tile_pos.x) - radius, int(tile_pos.x) + radius + 1):
-        for y in range(int(tile_pos.y) - radius, int(tile_pos.y) + radius + 1):
-            try:
-                tile = tilemap.tiles[(x, y)]
-            except KeyError:
-                # Outside map boundaries (for some reason)
-                continue
-
-            neighboring_tile_entities.append(tile)
-
-    return neighboring_tile_entities
-
-
-def pixel_to_tile(
-    pixel_pos: Position,
-) -> pygame.Vector2:
-    return pygame.Vector2(
-        round(pixel_pos.x / TILE_SIZE), round(pixel_pos.y / TILE_SIZE)
-    )
+    return get_atlas(font, color, "black", width).render(text, wraplength, align)
 
 
 class Expansion:
@@ -76,6 +21,8 @@ class Expansion:
     Number expansion and contraption
     """
 
+    __slots__ = ("number", "lower_limit", "upper_limit", "speed")
+
     def __init__(
         self,
         number: float,
@@ -1,4 +1,27 @@
+import time
+
+start = time.perf_counter()
+
+import sys
+
+from engine.trace import StartupTrace
+from src.common import FPS
 from src.game import Game
 
 if __name__ == "__main__":
-    Game().run()
+    trace = None
+    if "--trace-startup" in sys.argv:
+        trace = StartupTrace(start)
+        trace.mark("imports")
+
+    fps = FPS
+    for arg in sys.argv:
+        if arg.startswith("--fps="):
+            fps = int(arg.removeprefix("--fps="))
+
+    Game(
+        dirty_rects="--dirty-rects" in sys.argv,
+        fps=fps,
+        trace=trace,
+        profile_systems="--profile-systems" in sys.argv,
+    ).run()
@@ -1,10 +1,29 @@
+import pygame
+
 WIDTH = 512 / 2
 HEIGHT = 288 / 2
 
 TILE_SIZE = 16
 
+# the simulation always runs at TICK_RATE updates per second,
+# independently of the display's frame rate
+TICK_RATE = 60
+FPS = 60
+# after a stall, at most this many seconds are caught up
+MAX_FRAME_TIME = 0.07
+
 FADE_SPEED = 27
 
 FONT_PATH = "assets/loadable/graphics/Minecraftia-Regular.ttf"
+MAP_PATH = "assets/map/map.tmx"
 DATA_PATH = "assets/data/global_data.json"
 SAVE_PATH = "assets/data/player_save.json"
+
+# the keys every action is bound to
+ACTIONS = {
+    "left": (pygame.K_a,),
+    "right": (pygame.K_d,),
+    "jump": (pygame.K_SPACE,),
+    "interact": (pygame.K_e,),
+    "pause": (pygame.K_ESCAPE,),
+}
@@ -1,64 +1,186 @@
-import json
+import importlib
+from typing import Optional
 
 import pygame
 
 from engine._types import EventInfo
+from engine.asset_loader import release_assets
 from engine.enums import GameStates
-from src.common import HEIGHT, WIDTH
-from src.states.credits import CreditsState
-from src.states.game_state import GameState
-from src.states.intro import IntroState
-from src.states.menu import MenuState
+from engine.input import Input
+from engine.prefetch import prefetcher
+from engine.store import store
+from engine.trace import StartupTrace
+from src.common import ACTIONS, FPS, HEIGHT, MAX_FRAME_TIME, TICK_RATE, WIDTH
+
+# the states' modules are only imported once they're needed
+STATE_CLASSES = {
+    GameStates.GAME: ("src.states.game_state", "GameState"),
+    GameStates.MENU: ("src.states.menu", "MenuState"),
+    GameStates.INTRO: ("src.states.intro", "IntroState"),
+    GameStates.CREDITS: ("src.states.credits", "CreditsState"),
+}
+
+
+def get_state_class(state: GameStates) -> type:
+    module, name = STATE_CLASSES[state]
+    return getattr(importlib.import_module(module), name)
 
 
 class Game:
-    def __init__(self):
+    def __init__(
+        self,
+        dirty_rects: bool = False,
+        fps: int = FPS,
+        trace: Optional[StartupTrace] = None,
+        profile_systems: bool = False,
+    ):
+        """
+        Parameters:
+            dirty_rects: only present the regions of the screen that changed
+            fps: the display's frame rate
+            trace: prints how long the startup took once the first frame is shown
+            profile_systems: prints how long the systems of a state took
+                             on average when the state is left
+        """
+        self.trace = trace
+        self.profile_systems = profile_systems
+
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.SCALED)
         self.clock = pygame.time.Clock()
+        if self.trace is not None:
+            self.trace.mark("display")
+        self.fps = fps
+
+        # simulation time that hasn't been stepped through yet, in seconds
+        self.accumulator = 0.0
+        # events that arrived since the last update
+        self.pending_events = []
+        self.input = Input(ACTIONS)
 
-        self.states = {
-            GameStates.GAME: GameState,
-            GameStates.MENU: MenuState,
-            GameStates.INTRO: IntroState,
-            GameStates.CREDITS: CreditsState,
-        }
         self.state = GameStates.MENU
-        self.game_state = self.states[self.state](0)
+        self.game_state = get_state_class(self.state)()
+        if self.trace is not None:
+            self.trace.mark("menu state")
+        # the state that is being loaded in the background
+        self.prefetched_state = None
+
+        # only present the regions the states report as changed
+        self.dirty_rects = dirty_rects
+        self.last_dirty_rects = None
+
+    def report_systems(self):
+        scheduler = getattr(self.game_state, "scheduler", None)
+        if self.profile_systems and scheduler is not None:
+            print(f"{self.state.name}\n{scheduler.report()}", flush=True)
 
     def _exit(self):
         if self.state == GameStates.GAME:
             self.game_state.save()
-        pygame.quit()
+        self.report_systems()
+        prefetcher.shutdown()
+        try:
+            # raises if a save couldn't be written, so the error isn't lost
+            store.flush()
+        finally:
+            pygame.quit()
         raise SystemExit
 
+    def present(self):
+        if not self.dirty_rects:
+            pygame.display.flip()
+            return
+
+        # None means that the whole screen changed
+        rects = self.game_state.dirty_rects
+        if rects is None or self.last_dirty_rects is None:
+            pygame.display.flip()
+        # the regions of the last frame are included so that
+        # things that moved or disappeared get erased.
+        # if both are empty, nothing changed and the frame is skipped
+        elif rects or self.last_dirty_rects:
+            pygame.display.update(rects + self.last_dirty_rects)
+
+        self.last_dirty_rects = rects
+
+    def get_event_info(self, events: list, dt: float) -> EventInfo:
+        """
+        The input is indexed again on every call,
+        so it only holds the events of the latest event info
+
+        Parameters:
+            events: the events to pass to the state
+            dt: the time to advance by, in seconds
+        """
+        self.input.update(events)
+
+        return {
+            "events": events,
+            # the game's speeds are tuned to deltatime in tenths of a second
+            "dt": dt * 10,
+            "input": self.input,
+            "mouse_pos": pygame.mouse.get_pos(),
+            # how far the drawn frame is between the last two updates
+            "interpolation": self.accumulator * TICK_RATE,
+        }
+
+    def step(self) -> None:
+        """
+        Updates the state in fixed steps until it caught up with the clock
+        """
+        step = 1 / TICK_RATE
+        while self.accumulator >= step:
+            self.accumulator -= step
+
+            # events are only handled once, by the first step after them
+            event_info = self.get_event_info(self.pending_events, step)
+            self.pending_events = []
+            self.game_state.update(event_info)
+
+            if self.game_state.exit:
+                self._exit()
+            if self.game_state.next_state is not None:
+                break
+
     def run(self):
         while True:
-            dt = self.clock.tick(60) / 100
-            dt = min(0.7, dt)
-
-            event_info: EventInfo = {
-                "events": pygame.event.get(),
-                "dt": dt,
-                "keys": pygame.key.get_pressed(),
-                "mouse_pos": pygame.mouse.get_pos(),
-                "mouse_keys": pygame.mouse.get_pressed(),
-            }
-
-            for event in event_info["events"]:
+            frame_time = min(MAX_FRAME_TIME, self.clock.tick(self.fps) / 1000)
+            self.accumulator += frame_time
+
+            events = pygame.event.get()
+            for event in events:
                 if event.type == pygame.QUIT:
                     self._exit()
+            self.pending_events += events
 
             if self.game_state.next_state is not None:
+                self.report_systems()
                 self.state = self.game_state.next_state
-                self.game_state = self.states[self.state](self.game_state.ost_pos)
+                previous_state = self.game_state
+                self.game_state = get_state_class(self.state)()
+                # released after the next state got its assets,
+                # so the ones they share stay loaded
+                release_assets(previous_state.assets)
+                self.prefetched_state = None
+                # the time spent loading the state isn't simulated
+                self.clock.tick()
+                self.accumulator = 0.0
 
-            self.game_state.draw(self.screen, event_info)
-            self.game_state.update(event_info)
+            self.step()
 
-            if self.game_state.exit:
-                self._exit()
+            # the next state is loaded while the current one fades out
+            upcoming = self.game_state._next_state
+            if upcoming is not None and upcoming != self.prefetched_state:
+                self.prefetched_state = upcoming
+                get_state_class(upcoming).prefetch()
 
-            pygame.display.flip()
+            # animations that only affect drawing advance with the display
+            self.game_state.draw(self.screen, self.get_event_info([], frame_time))
+
+            self.present()
+            if self.trace is not None:
+                self.trace.mark("first frame")
+                print(self.trace.report(), flush=True)
+                self.trace = None
             pygame.display.set_caption(
                 f"Untitled Beach Game | FPS: {self.clock.get_fps():.0f}"
             )
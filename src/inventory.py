@@ -0,0 +1,65 @@
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Set
+
+
+class Inventory:
+    """
+    The items the player carries and has delivered, kept in the player's save.
+    Lookups use sets, and listeners are only called when their items change,
+    so nothing has to check the items every frame
+    """
+
+    def __init__(self, settings: dict):
+        """
+        Parameters:
+            settings: the player's save, its item lists are kept up to date
+        """
+        self.settings = settings
+        self.carried: Set[str] = set(settings["inventory"])
+        self.delivered: Set[str] = set(settings["items_delivered"])
+
+        self.listeners: Dict[str, List[Callable[[], None]]] = defaultdict(list)
+
+    def has(self, item: str) -> bool:
+        return item in self.carried
+
+    def was_delivered(self, item: str) -> bool:
+        return item in self.delivered
+
+    def subscribe(self, items: Iterable[str], listener: Callable[[], None]) -> None:
+        """
+        Calls `listener` whenever one of `items` is picked up or delivered
+        """
+        for item in items:
+            self.listeners[item].append(listener)
+
+    def notify(self, items: Iterable[str]) -> None:
+        # a listener watching several of the items is only called once
+        listeners = {}
+        for item in items:
+            for listener in self.listeners.get(item, ()):
+                listeners[listener] = None
+
+        for listener in listeners:
+            listener()
+
+    def add(self, item: str) -> None:
+        if item in self.carried:
+            return
+
+        self.carried.add(item)
+        self.settings["inventory"].append(item)
+        self.notify((item,))
+
+    def deliver(self, items: Iterable[str]) -> None:
+        """
+        Moves the items from the inventory to the delivered items
+        """
+        items = list(items)
+        for item in items:
+            self.carried.discard(item)
+            self.settings["inventory"].remove(item)
+            self.delivered.add(item)
+            self.settings["items_delivered"].append(item)
+
+        self.notify(items)
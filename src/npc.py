@@ -1,38 +1,61 @@
-from typing import Sequence
+from typing import Dict, List, Sequence, Tuple
 
+import numpy as np
 import pygame
-from pytmx import TiledObject
 
 from engine._types import EventInfo, Position
-from engine.animations import Animation
+from engine.animations import Animation, get_frames
 from engine.camera import Camera
-from engine.utils import Expansion, render_outline_text, reverse_animation
-from src.common import FONT_PATH
+from engine.collision import CollisionGrid
+from engine.draw_list import DrawList
+from engine.enums import DrawLayers, EntityStates, Facing
+from engine.map_compiler import EMPTY
+from engine.physics import PhysicsBodies
+from engine.text import get_font
+from engine.tilemap import MapObject
+from engine.utils import Expansion, render_outline_text
+from src.inventory import Inventory
 from src.player import Player
 
-pygame.font.init()
-
 
 class TalkingNPC:
+    __slots__ = (
+        "inventory",
+        "animations",
+        "state",
+        "facing",
+        "rect",
+        "pos",
+        "alpha_expansion",
+        "lines",
+        "line_index",
+        "text_surf",
+        "interacting",
+        "talking",
+    )
+
     TEXT_WRAPLENGTH = 196
-    FONT = pygame.Font(FONT_PATH, 8)
 
-    def __init__(self, assets: dict, obj: TiledObject):
-        self.animations = {
-            "left_idle": Animation(assets[f"{obj.name}_idle"], 0.1),
-            "left_talk": Animation(assets[f"{obj.name}_talk"], 0.6),
-        }
-        self.animations |= {
-            "right_idle": reverse_animation(self.animations["left_idle"]),
-            "right_talk": reverse_animation(self.animations["left_talk"]),
-        }
+    def __init__(self, assets: dict, obj: MapObject, inventory: Inventory):
+        # the player's items, which quests react to
+        self.inventory = inventory
+
+        # the animations of every state, indexed by Facing
+        self.animations: Dict[EntityStates, Tuple[Animation, Animation]] = {}
+        for state, speed in ((EntityStates.IDLE, 0.1), (EntityStates.TALK, 0.6)):
+            asset = f"{obj.name}_{state.value}"
+            self.animations[state] = (
+                Animation(get_frames(assets, asset), speed),
+                Animation(get_frames(assets, asset, flip=True), speed),
+            )
 
-        self.state = "left_idle"
+        self.state = EntityStates.IDLE
+        self.facing = Facing.LEFT
 
         # in case the object's size is incorrect
         obj_rect = pygame.Rect(obj.x, obj.y, obj.width, obj.height)
         self.rect = (
-            self.animations["left_idle"]
+            self.animations[EntityStates.IDLE][Facing.LEFT]
             .frames[0]
             .get_rect(midbottom=(obj_rect.midbottom))
         )
@@ -46,6 +69,7 @@ class TalkingNPC:
         lines = obj.properties["text"].split("\n\n")
         self.render_text_default(lines)
 
+        # whether the player is touching the NPC, set by NPCStage's triggers
         self.interacting = False
         self.talking = False
 
@@ -53,10 +77,10 @@ class TalkingNPC:
         """
         Renders the NPC's speech and inserts a default line at the start
         """
-        self.lines = [render_outline_text(line, self.FONT, "white") for line in lines]
+        self.lines = [render_outline_text(line, get_font(), "white") for line in lines]
 
         # start at a default line
-        default_text = render_outline_text("Press E to talk", self.FONT, "white")
+        default_text = render_outline_text("Press E to talk", get_font(), "white")
         self.lines.insert(0, default_text)
 
         self.line_index = 0
@@ -69,7 +93,7 @@ class TalkingNPC:
         """
         Renders the NPC's speech and (no default line)
         """
-        self.lines = [render_outline_text(line, self.FONT, "white") for line in lines]
+        self.lines = [render_outline_text(line, get_font(), "white") for line in lines]
 
         self.line_index = 0
         self.text_surf = self.lines[self.line_index]
@@ -78,25 +102,40 @@ class TalkingNPC:
         self.text_surf[1].set_alpha(int(self.alpha_expansion.number))
 
     def handle_states(self, player: Player):
-        direction = "left"
-        if player.rect.x > self.pos.x:
-            direction = "right"
+        self.facing = Facing.RIGHT if player.rect.x > self.pos.x else Facing.LEFT
 
-        action = "talk" if self.interacting and self.talking else "idle"
+        if self.interacting and self.talking:
+            self.state = EntityStates.TALK
+        else:
+            self.state = EntityStates.IDLE
 
-        self.state = f"{direction}_{action}"
+    def sleep(self):
+        """
+        Called when the NPC stops being updated because it's far from the camera,
+        the text is hidden like it would have been by the time the player is back
+        """
+        self.talking = False
+        self.alpha_expansion.number = self.alpha_expansion.lower_limit
+        self.text_surf[0].set_alpha(0)
+        self.text_surf[1].set_alpha(0)
 
-    def update(self, event_info: EventInfo, player: Player):
-        self.interacting = self.rect.colliderect(player.rect)
+    def get_draw_rect(self) -> pygame.Rect:
+        """
+        Returns the area of the map the NPC draws on
+        """
+        text_rect = self.text_surf[0].get_rect(
+            midbottom=(self.rect.centerx, self.rect.top - 2)
+        )
+        return self.rect.union(text_rect)
 
+    def update(self, event_info: EventInfo, player: Player):
         # handle E key presses, change the text lines
         if self.interacting:
-            for event in event_info["events"]:
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_e:
-                    self.talking = True
-                    if self.line_index < len(self.lines) - 1:
-                        self.line_index += 1
-                        self.text_surf = self.lines[self.line_index]
+            if event_info["input"].pressed("interact"):
+                self.talking = True
+                if self.line_index < len(self.lines) - 1:
+                    self.line_index += 1
+                    self.text_surf = self.lines[self.line_index]
         else:
             self.talking = False
 
@@ -106,23 +145,34 @@ class TalkingNPC:
 
         self.handle_states(player)
 
-    def draw(self, screen: pygame.Surface, camera: Camera, event_info: EventInfo):
-        self.animations[self.state].play(
-            screen, camera.apply(self.pos), event_info["dt"]
-        )
-        text_pos = (
+    def draw(self, draw_list: DrawList, camera: Camera, event_info: EventInfo):
+        animation = self.animations[self.state][self.facing]
+        animation.update(event_info["dt"])
+        draw_list.submit(animation.get_frame(), camera.apply(self.pos), DrawLayers.NPC)
+
+        text_pos = camera.apply(
             self.text_surf[0]
             .get_rect(midbottom=(self.rect.centerx, self.rect.top - 2))
             .topleft
         )
-
-        screen.blit(self.text_surf[1], camera.apply(text_pos))
-        screen.blit(self.text_surf[0], camera.apply(text_pos))
+        draw_list.submit(self.text_surf[1], text_pos, DrawLayers.NPC_TEXT)
+        draw_list.submit(self.text_surf[0], text_pos, DrawLayers.NPC_TEXT)
 
 
 class QuestGiverNPC(TalkingNPC):
-    def __init__(self, assets: dict, obj):
-        super().__init__(assets, obj)
+    __slots__ = (
+        "item",
+        "text_if_item",
+        "exclamation",
+        "exclamation_pos",
+        "sfx",
+        "quest_done",
+        "check_finished",
+        "quest_ongoing",
+    )
+
+    def __init__(self, assets: dict, obj: MapObject, inventory: Inventory):
+        super().__init__(assets, obj, inventory)
 
         self.item = obj.properties["item"]
         self.text_if_item = obj.properties["text_if_item"]
@@ -137,11 +187,15 @@ class QuestGiverNPC(TalkingNPC):
         self.check_finished = False
         self.quest_ongoing = False
 
-    def update(self, event_info: EventInfo, player: Player):
-        super().update(event_info, player)
+        inventory.subscribe((self.item,), self.update_quest)
+        self.update_quest()
 
-        self.quest_done = self.item in player.settings["items_delivered"]
-        self.quest_ongoing = self.item in player.settings["inventory"]
+    def update_quest(self):
+        """
+        Updates the state of the quest, called when the quest's item changes
+        """
+        self.quest_done = self.inventory.was_delivered(self.item)
+        self.quest_ongoing = self.inventory.has(self.item)
 
         # if the quest was already done
         if self.quest_done and not self.check_finished:
@@ -150,30 +204,50 @@ class QuestGiverNPC(TalkingNPC):
             lines = self.text_if_item.split("\n\n")
             self.render_text_default(lines)
 
+    def update(self, event_info: EventInfo, player: Player):
+        super().update(event_info, player)
+
         # if the quest is starting
-        elif self.talking and not self.quest_ongoing and not self.quest_done:
+        if self.talking and not self.quest_ongoing and not self.quest_done:
             self.sfx.play()
-            player.settings["inventory"].append(self.item)
+            self.inventory.add(self.item)
             player.new_quest = True
 
-    def draw(self, screen: pygame.Surface, camera: Camera, event_info: EventInfo):
+    def get_draw_rect(self) -> pygame.Rect:
+        return super().get_draw_rect().union(self.exclamation_pos)
+
+    def draw(self, draw_list: DrawList, camera: Camera, event_info: EventInfo):
         # the exclamation point should be in the background
         if not self.quest_done and not self.quest_ongoing and not self.talking:
-            screen.blit(self.exclamation, camera.apply(self.exclamation_pos))
+            draw_list.submit(
+                self.exclamation,
+                camera.apply(self.exclamation_pos),
+                DrawLayers.NPC_BACKGROUND,
+            )
 
-        super().draw(screen, camera, event_info)
+        super().draw(draw_list, camera, event_info)
 
 
 class QuestReceiverNPC(TalkingNPC):
-    def __init__(self, assets: dict, obj):
-        super().__init__(assets, obj)
+    __slots__ = (
+        "items",
+        "text_if_item",
+        "quest_done",
+        "quest_ongoing",
+        "check_finished_2",
+        "exclamation",
+        "exclamation_pos",
+        "sfx",
+    )
+
+    def __init__(self, assets: dict, obj: MapObject, inventory: Inventory):
+        super().__init__(assets, obj, inventory)
 
         self.items = obj.properties["item"].split("\n\n")
         self.text_if_item = obj.properties["text_if_item"]
         self.quest_done = False
         self.quest_ongoing = False
         # goofy
-        self.check_finished = False
         self.check_finished_2 = False
 
         self.exclamation = assets["exclamation"]
@@ -183,22 +257,23 @@ class QuestReceiverNPC(TalkingNPC):
 
         self.sfx = assets["quest_receive"]
 
-    def update(self, event_info: EventInfo, player: Player):
-        super().update(event_info, player)
-
-        self.quest_done = all(
-            [item in player.settings["items_delivered"] for item in self.items]
-        )
-        self.quest_ongoing = all(
-            [item in player.settings["inventory"] for item in self.items]
-        )
+        inventory.subscribe(self.items, self.update_quest)
+        self.update_quest()
 
         # if the quest was already finished
-        if self.quest_done and not self.check_finished:
+        if self.quest_done:
             lines = self.text_if_item.split("\n\n")
             self.render_text_default(lines)
-        # we only need to check for this once
-        self.check_finished = True
+
+    def update_quest(self):
+        """
+        Updates the state of the quest, called when the quest's items change
+        """
+        self.quest_done = all(self.inventory.was_delivered(item) for item in self.items)
+        self.quest_ongoing = all(self.inventory.has(item) for item in self.items)
+
+    def update(self, event_info: EventInfo, player: Player):
+        super().update(event_info, player)
 
         # if player finished the quest and the text
         # hasn't been rendered already
@@ -210,58 +285,214 @@ class QuestReceiverNPC(TalkingNPC):
         if self.check_finished_2 and self.talking and self.quest_ongoing:
             self.sfx.play()
 
-            for item in self.items:
-                player.settings["inventory"].remove(item)
-                player.settings["items_delivered"].append(item)
+            self.inventory.deliver(self.items)
             player.settings["seashells"] += 1
 
-    def draw(self, screen: pygame.Surface, camera: Camera, event_info: EventInfo):
+    def get_draw_rect(self) -> pygame.Rect:
+        return super().get_draw_rect().union(self.exclamation_pos)
+
+    def draw(self, draw_list: DrawList, camera: Camera, event_info: EventInfo):
         if not self.quest_done:
-            screen.blit(self.exclamation, camera.apply(self.exclamation_pos))
+            draw_list.submit(
+                self.exclamation,
+                camera.apply(self.exclamation_pos),
+                DrawLayers.NPC_BACKGROUND,
+            )
 
-        super().draw(screen, camera, event_info)
+        super().draw(draw_list, camera, event_info)
 
 
 class ItemNPC:
-    FONT = pygame.Font(FONT_PATH, 8)
-
-    def __init__(self, assets: dict, obj: TiledObject):
+    __slots__ = (
+        "inventory",
+        "surface",
+        "rect",
+        "item",
+        "picked_up",
+        "interacting",
+        "alpha_expansion",
+        "pick_up_text",
+        "text_darkener",
+        "text_pos",
+    )
+
+    def __init__(self, assets: dict, obj: MapObject, inventory: Inventory):
+        self.inventory = inventory
         self.surface = assets[obj.name]
         obj_rect = pygame.Rect(obj.x, obj.y, obj.width, obj.height)
         self.rect = self.surface.get_rect(midbottom=obj_rect.midbottom)
         self.item = obj.properties["item"]
         self.picked_up = False
+        # whether the player is touching the item, set by NPCStage's triggers
+        self.interacting = False
 
         self.alpha_expansion = Expansion(0, 0, 255, 25)
         self.pick_up_text, self.text_darkener = render_outline_text(
-            "Press E to pick up", self.FONT, "white"
+            "Press E to pick up", get_font(), "white"
         )
 
         self.text_pos = self.pick_up_text.get_rect(midbottom=self.rect.midtop).topleft
 
-    def update(self, event_info: EventInfo, player: Player):
-        if (
-            self.item in player.settings["inventory"]
-            or self.item in player.settings["items_delivered"]
-        ):
+        inventory.subscribe((self.item,), self.update_item)
+        self.update_item()
+
+    def update_item(self):
+        """
+        Hides the item once it was picked up, called when the item changes
+        """
+        if self.inventory.has(self.item) or self.inventory.was_delivered(self.item):
             self.picked_up = True
 
-        interacting = player.rect.colliderect(self.rect)
-        if interacting and not self.picked_up:
-            for event in event_info["events"]:
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_e:
-                    self.picked_up = True
-                    player.settings["inventory"].append(self.item)
+    def update(self, event_info: EventInfo, player: Player):
+        if self.interacting and not self.picked_up:
+            if event_info["input"].pressed("interact"):
+                self.inventory.add(self.item)
 
         self.alpha_expansion.update(
-            interacting and not self.picked_up, event_info["dt"]
+            self.interacting and not self.picked_up, event_info["dt"]
         )
         self.pick_up_text.set_alpha(int(self.alpha_expansion.number))
         self.text_darkener.set_alpha(min(175, self.alpha_expansion.number))
 
-    def draw(self, screen: pygame.Surface, camera: Camera, event_info: EventInfo):
+    def sleep(self):
+        """
+        Called when the item stops being updated because it's far from the camera
+        """
+        self.alpha_expansion.number = self.alpha_expansion.lower_limit
+        self.pick_up_text.set_alpha(0)
+        self.text_darkener.set_alpha(0)
+
+    def get_draw_rect(self) -> pygame.Rect:
+        """
+        Returns the area of the map the item draws on
+        """
+        text_rect = self.pick_up_text.get_rect(topleft=self.text_pos)
+        return self.rect.union(text_rect)
+
+    def draw(self, draw_list: DrawList, camera: Camera, event_info: EventInfo):
         if not self.picked_up:
-            screen.blit(self.surface, camera.apply(self.rect))
+            draw_list.submit(self.surface, camera.apply(self.rect), DrawLayers.NPC)
+
+        text_pos = camera.apply(self.text_pos)
+        draw_list.submit(self.text_darkener, text_pos, DrawLayers.NPC_TEXT)
+        draw_list.submit(self.pick_up_text, text_pos, DrawLayers.NPC_TEXT)
+
+
+class WalkingNPCs:
+    """
+    NPCs that walk back and forth, turning around at walls, ledges
+    and the ends of the area they were placed in.
+    They're all stepped together, see PhysicsBodies
+    """
+
+    SPEED = 1.5
+    ANIMATION_SPEED = 0.3
+
+    def __init__(self, assets: dict, objects: Sequence[MapObject], grid: CollisionGrid):
+        self.bodies = PhysicsBodies(grid)
+
+        #                  facing left              facing right
+        self.frames: List[Tuple[Sequence[pygame.Surface], Sequence[pygame.Surface]]]
+        self.frames = []
+        bounds = []
+        for obj in objects:
+            walk = f"{obj.name}_walk"
+            left, right = get_frames(assets, walk), get_frames(assets, walk, True)
+            self.frames.append((left, right))
+
+            # the object is the area the NPC walks in
+            rect = left[0].get_frect(
+                midbottom=(obj.x + obj.width / 2, obj.y + obj.height)
+            )
+            self.bodies.add(rect)
+            bounds.append((obj.x, obj.x + obj.width))
+
+        self.bounds = np.array(bounds).reshape(-1, 2)
+        self.facing = np.ones(len(self.bodies))
+        self.frame_index = np.zeros(len(self.bodies))
+        self.frame_counts = np.array([len(left) for left, _ in self.frames])
+        # where the NPCs were before the last update, for interpolation
+        self.previous_pos = self.bodies.pos.copy()
+
+    def update(self, event_info: EventInfo, area: pygame.Rect):
+        """
+        Parameters:
+            event_info: the event info
+            area: only the NPCs in this area move, the others are asleep
+        """
+        dt = event_info["dt"]
+        bodies = self.bodies
+
+        left = bodies.pos[:, 0]
+        top = bodies.pos[:, 1]
+        awake = (
+            (left < area.right)
+            & (left + bodies.size[:, 0] > area.left)
+            & (top < area.bottom)
+            & (top + bodies.size[:, 1] > area.top)
+        )
+
+        self.previous_pos = bodies.pos.copy()
+        bodies.vel[:, 0] = self.facing * self.SPEED
+        bodies.step(dt, np.flatnonzero(awake))
+
+        left = bodies.pos[:, 0]
+        right = left + bodies.size[:, 0]
+        bottom = bodies.pos[:, 1] + bodies.size[:, 1]
+        forward = self.facing > 0
+
+        # the tile under the front edge
+        front = np.where(forward, right - 1, left)
+        ground = bodies.get_tiles(
+            np.floor(front / bodies.grid.tilewidth).astype(int),
+            np.floor(bottom / bodies.grid.tileheight).astype(int),
+        )
+        ledge = bodies.grounded & (ground == EMPTY)
+        outside = np.where(
+            forward, right >= self.bounds[:, 1], left <= self.bounds[:, 0]
+        )
+
+        turn = awake & (bodies.blocked | ledge | outside)
+        self.facing = np.where(turn, -self.facing, self.facing)
+
+        self.frame_index = np.where(
+            awake,
+            (self.frame_index + self.ANIMATION_SPEED * dt) % self.frame_counts,
+            self.frame_index,
+        )
+
+    def get_draw_rects(self, alpha: float) -> List[pygame.FRect]:
+        """
+        Returns the NPCs' rects in between their last two positions
+
+        Parameters:
+            alpha: 0 is the previous position, 1 is the latest one
+        """
+        positions = self.previous_pos + (self.bodies.pos - self.previous_pos) * alpha
+
+        return [
+            pygame.FRect(pos, size) for pos, size in zip(positions, self.bodies.size)
+        ]
+
+    def draw(
+        self, draw_list: DrawList, camera: Camera, event_info: EventInfo
+    ) -> List[pygame.FRect]:
+        """
+        Submits the NPCs that are on the screen
+
+        Returns:
+            The areas of the map that were drawn on
+        """
+        drawn = []
+        rects = self.get_draw_rects(event_info["interpolation"])
+        for rect, (left, right), facing, index in zip(
+            rects, self.frames, self.facing, self.frame_index
+        ):
+            if not rect.colliderect(camera.view_rect):
+                continue
+
+            frame = (right if facing > 0 else left)[int(index)]
+            draw_list.submit(frame, camera.apply(rect), DrawLayers.NPC)
+            drawn.append(rect)
 
-        screen.blit(self.text_darkener, camera.apply(self.text_pos))
-        screen.blit(self.pick_up_text, camera.apply(self.text_pos))
+        return drawn
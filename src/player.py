@@ -1,29 +1,52 @@
 import itertools
-import json
+from typing import Dict, Tuple
 
 import pygame
 
 from engine._types import EventInfo, Position
-from engine.animations import Animation
+from engine.animations import Animation, get_frames
 from engine.camera import Camera
-from engine.enums import EntityStates
-from engine.utils import reverse_animation
+from engine.draw_list import DrawList
+from engine.enums import DrawLayers, EntityStates, Facing
+from engine.store import store
 from src.common import SAVE_PATH
+from src.inventory import Inventory
 
 
 class Player:
+    __slots__ = (
+        "animations",
+        "facing",
+        "state",
+        "jump_cycle",
+        "jump_sfx",
+        "rect",
+        "previous_pos",
+        "vel",
+        "speed",
+        "gravity",
+        "jump_height",
+        "jumping",
+        "alive",
+        "new_quest",
+        "settings",
+        "inventory",
+    )
+
     def __init__(self, assets: dict):
-        self.animations = {
-            "walk_left": Animation(assets["player_walk"], 0.8),
-            "idle_left": Animation(assets["player_idle"], 0.05),
-            "jump_left": Animation(assets["player_jump"], 0),
-        }
-        self.animations |= {
-            "walk_right": reverse_animation(self.animations["walk_left"]),
-            "idle_right": reverse_animation(self.animations["idle_left"]),
-            "jump_right": reverse_animation(self.animations["jump_left"]),
-        }
-        self.facing = "right"
+        # the animations of every state, indexed by Facing
+        self.animations: Dict[EntityStates, Tuple[Animation, Animation]] = {}
+        for state, speed in (
+            (EntityStates.WALK, 0.8),
+            (EntityStates.IDLE, 0.05),
+            (EntityStates.JUMP, 0),
+        ):
+            asset = f"player_{state.value}"
+            self.animations[state] = (
+                Animation(get_frames(assets, asset), speed),
+                Animation(get_frames(assets, asset, True), speed),
+            )
+        self.facing = Facing.RIGHT
         self.state = EntityStates.IDLE
 
         jump_sfx_arr = [assets[f"jump_{i}"] for i in range(1, 5)]
@@ -31,6 +54,8 @@ class Player:
         self.jump_sfx = jump_sfx_arr[0]
 
         self.rect = assets["player_idle"][0].get_frect()
+        # where the player was before the last update, for interpolation
+        self.previous_pos = pygame.Vector2()
         self.vel = pygame.Vector2()
         self.speed = 4
         self.gravity = 3.5
@@ -43,43 +68,49 @@ class Player:
         self.load_save()
 
     def load_save(self):
-        with open(SAVE_PATH, "r") as f:
-            self.settings = json.loads(f.read())
-            self.rect.topleft = self.settings["checkpoint_pos"]
+        self.settings = store.load(SAVE_PATH)
+        self.inventory = Inventory(self.settings)
+        self.respawn()
+
+    def respawn(self):
+        """
+        Puts the player at the last checkpoint
+        """
+        self.rect.topleft = self.settings["checkpoint_pos"]
+        self.previous_pos.update(self.rect.topleft)
+        self.vel.update(0, 0)
+        self.state = EntityStates.IDLE
+        self.facing = Facing.RIGHT
+        self.jumping = False
+        self.alive = True
 
     def dump_save(self):
-        with open(SAVE_PATH, "w") as f:
-            f.write(json.dumps(self.settings, indent=4))
+        store.save(SAVE_PATH, self.settings)
 
     def move(self, event_info: EventInfo):
         dt = event_info["dt"]
-        keys = event_info["keys"]
+        controls = event_info["input"]
 
         self.state = EntityStates.IDLE
         self.vel.x = 0
-        if not (keys[pygame.K_a] and keys[pygame.K_d]):
-            if keys[pygame.K_d]:
+        if not (controls.held("left") and controls.held("right")):
+            if controls.held("right"):
                 self.state = EntityStates.WALK
-                self.facing = "right"
+                self.facing = Facing.RIGHT
                 self.vel.x = self.speed
-            elif keys[pygame.K_a]:
+            elif controls.held("left"):
                 self.state = EntityStates.WALK
-                self.facing = "left"
+                self.facing = Facing.LEFT
                 self.vel.x = -self.speed
 
         self.vel.y += self.gravity * dt
 
-        for event in event_info["events"]:
-            if (
-                event.type == pygame.KEYDOWN
-                and event.key == pygame.K_SPACE
-                and not self.jumping
-            ):
-                self.jumping = True
-                self.vel.y = -self.jump_height
+        if controls.pressed("jump") and not self.jumping:
+            self.jumping = True
+            self.vel.y = -self.jump_height
 
-                self.jump_sfx = next(self.jump_cycle)
-                self.jump_sfx.play()
+            self.jump_sfx = next(self.jump_cycle)
+            self.jump_sfx.play()
 
         if self.jumping:
             self.state = EntityStates.JUMP
@@ -93,6 +124,20 @@ class Player:
         else:
             self.move(event_info)
 
-    def draw(self, screen: pygame.Surface, camera: Camera, event_info: EventInfo):
-        animation = self.animations[f"{self.state.value}_{self.facing}"]
-        animation.play(screen, camera.apply(self.rect), event_info["dt"])
+    def get_draw_rect(self, alpha: float) -> pygame.FRect:
+        """
+        Returns the player's rect in between its last two positions
+
+        Parameters:
+            alpha: 0 is the previous position, 1 is the latest one
+        """
+        rect = self.rect.copy()
+        rect.topleft = self.previous_pos.lerp(self.rect.topleft, alpha)
+
+        return rect
+
+    def draw(self, draw_list: DrawList, camera: Camera, event_info: EventInfo):
+        animation = self.animations[self.state][self.facing]
+        animation.update(event_info["dt"])
+        rect = self.get_draw_rect(event_info["interpolation"])
+        draw_list.submit(animation.get_frame(), camera.apply(rect), DrawLayers.PLAYER)
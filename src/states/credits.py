@@ -2,16 +2,16 @@ import pygame
 
 from engine._types import EventInfo
 from engine.animations import FadeTransition
-from engine.asset_loader import load_assets
+from engine.asset_loader import load_assets, preload_assets
 from engine.enums import GameStates
+from engine.prefetch import prefetcher
+from engine.text import get_font
 from engine.utils import render_outline_text
-from src.common import DATA_PATH, FADE_SPEED, FONT_PATH, HEIGHT, WIDTH
-
-pygame.font.init()
+from src.common import DATA_PATH, FADE_SPEED, HEIGHT, WIDTH
 
 
 class CreditsInit:
-    def __init__(self, *args):
+    def __init__(self):
         self.assets = load_assets("credits")
         self.assets["beach"].play(-1)
         # triggers the state switch
@@ -20,7 +20,16 @@ class CreditsInit:
         # but doesn't trigger the state switch
         self._next_state = None
         self.exit = False
-        self.ost_pos = 0
+        # regions of the screen that changed during the last draw,
+        # None means the whole screen
+        self.dirty_rects = None
+
+    @staticmethod
+    def prefetch() -> None:
+        """
+        Starts loading what the state needs in the background
+        """
+        prefetcher.submit(("assets", "credits"), preload_assets, "credits")
 
     def update(self, event_info: EventInfo):
         pass
@@ -30,24 +39,21 @@ class CreditsInit:
 
 
 class TextStage(CreditsInit):
-    FONT = pygame.Font(FONT_PATH, 8)
-
-    def __init__(self, *args):
-        super().__init__(*args)
-
-        self.FONT.align = pygame.FONT_CENTER
+    def __init__(self):
+        super().__init__()
 
         text = "And just like that, you made it to the beach, fearlessly helping all the doofuses you've met along the way.\n\npress E to continue"
-        self.text, _ = render_outline_text(text, self.FONT, "white")
+        self.text, _ = render_outline_text(
+            text, get_font(), "white", align=pygame.FONT_CENTER
+        )
         self.text_rect = self.text.get_rect(center=(WIDTH / 2, HEIGHT / 2))
 
     def update(self, event_info: EventInfo):
         super().update(event_info)
 
-        for event in event_info["events"]:
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_e:
-                self._next_state = GameStates.MENU
-                self.transition.fade_speed /= 5
+        if event_info["input"].pressed("interact"):
+            self._next_state = GameStates.MENU
+            self.transition.fade_speed /= 5
 
     def draw(self, screen: pygame.Surface, event_info: EventInfo):
         super().draw(screen, event_info)
@@ -56,10 +62,11 @@ class TextStage(CreditsInit):
 
 
 class TransitionStage(TextStage):
-    def __init__(self, *args):
-        super().__init__(*args)
+    def __init__(self):
+        super().__init__()
 
         self.transition = FadeTransition(True, FADE_SPEED, (WIDTH, HEIGHT))
+        self.drawn_alpha = None
 
     def update(self, event_info: EventInfo):
         super().update(event_info)
@@ -72,6 +79,15 @@ class TransitionStage(TextStage):
                 self.next_state = self._next_state
 
     def draw(self, screen: pygame.Surface, event_info: EventInfo):
+        # the text is static, so the screen only
+        # has to be redrawn while the fade changes
+        alpha = int(self.transition.alpha)
+        if alpha == self.drawn_alpha:
+            self.dirty_rects = []
+            return
+        self.drawn_alpha = alpha
+        self.dirty_rects = None
+
         super().draw(screen, event_info)
 
         self.transition.draw(screen)
@@ -1,32 +1,59 @@
-import json
-
+import numpy as np
 import pygame
 
-from engine._types import EventInfo
+from engine._types import EventInfo, Position
+from engine.activation import ActivationRegion
 from engine.animations import FadeTransition
-from engine.asset_loader import load_assets
+from engine.asset_loader import load_assets, preload_assets
 from engine.background import ParallaxBackground
 from engine.button import Button
 from engine.camera import Camera
-from engine.enums import GameStates
-from engine.particles import FadingOutText
+from engine.draw_list import DrawList
+from engine.enums import DrawLayers, GameStates, TriggerEvents
+from engine.music import music
+from engine.particles import ParticlePool
+from engine.prefetch import prefetcher
+from engine.scheduler import Scheduler
+from engine.spatial import SpatialIndex
+from engine.store import store
+from engine.text import get_font
 from engine.tilemap import TileLayerMap
-from engine.utils import get_neighboring_tiles, pixel_to_tile, render_outline_text
-from src.common import DATA_PATH, FADE_SPEED, FONT_PATH, HEIGHT, WIDTH
-from src.npc import ItemNPC, QuestGiverNPC, QuestReceiverNPC, TalkingNPC
+from engine.triggers import Trigger, TriggerSystem
+from engine.utils import render_outline_text
+from src.common import DATA_PATH, FADE_SPEED, HEIGHT, MAP_PATH, TILE_SIZE, WIDTH
+from src.npc import (
+    ItemNPC,
+    QuestGiverNPC,
+    QuestReceiverNPC,
+    TalkingNPC,
+    WalkingNPCs,
+)
 from src.player import Player
 
 
 class GameInit:
+    """
+    The stages set up the state's systems and register their update and draw
+    callbacks with the scheduler, which runs them in order every frame
+    """
+
     def __init__(self):
+        self.scheduler = Scheduler()
+        self.scheduler.add("frame", 0, draw=self.begin_frame)
+
         self.assets = load_assets("game")
         self.player = Player(self.assets)
 
-        self.tilemap = TileLayerMap("assets/map/map.tmx")
-        self.map = self.tilemap.make_map()
+        self.tilemap = prefetcher.get(MAP_PATH, TileLayerMap, MAP_PATH)
+        # areas of the map that react to the player,
+        # they're checked once the player has moved, see PlayerStage
+        self.triggers = TriggerSystem(int(WIDTH))
+        self.triggers.add_objects(self.tilemap.get_objects("triggers"))
 
         self.scroll = pygame.Vector2(self.player.rect.center)
         self.camera = Camera(WIDTH, HEIGHT)
+        # entities submit what they draw here, see DrawListStage
+        self.draw_list = DrawList()
 
         # triggers the state switch
         self.next_state = None
@@ -34,102 +61,138 @@ class GameInit:
         # but doesn't trigger the state switch
         self._next_state = None
         self.exit = False
+        # the player died, they respawn once the screen faded out
+        self.respawning = False
+
+        # regions of the screen that changed during the last draw,
+        # None means the whole screen
+        self.dirty_rects = None
+        self.full_redraw = True
+
+    @staticmethod
+    def prefetch() -> None:
+        """
+        Starts loading what the state needs in the background
+        """
+        prefetcher.submit(("assets", "game"), preload_assets, "game")
+        prefetcher.submit(MAP_PATH, TileLayerMap, MAP_PATH)
 
     def save(self):
         self.player.dump_save()
 
+    def respawn(self):
+        """
+        Puts the player back at the last checkpoint,
+        the rest of the world is kept as it is
+        """
+        self.respawning = False
+        self.full_redraw = True
+
+    def mark_dirty(self, rect: pygame.Rect) -> None:
+        """
+        Adds a region of the screen that changed this frame
+
+        Parameters:
+            rect: the region, in screen coordinates
+        """
+        if self.dirty_rects is None:
+            return
+
+        rect = rect.clip(0, 0, WIDTH, HEIGHT)
+        if rect:
+            self.dirty_rects.append(rect)
+
     def update(self, event_info: EventInfo):
-        pass
+        self.scheduler.update(event_info)
 
     def draw(self, screen: pygame.Surface, event_info: EventInfo):
-        pass
+        self.scheduler.draw(screen, event_info)
+
+    def begin_frame(self, screen: pygame.Surface, event_info: EventInfo):
+        self.dirty_rects = None if self.full_redraw else []
+        self.full_redraw = False
 
 
 class BackgroundStage(GameInit):
     def __init__(self):
         super().__init__()
 
-        self.suburb_background = ParallaxBackground(
-            [
-                (self.assets["bg0"], 0.025),
-                (self.assets["bg1"], 0.075),
-                (self.assets["bg2"], 0.15),
-            ]
-        )
-        self.downtown_background = ParallaxBackground(
-            [
-                (self.assets["bg0"], 0.025),
-                (self.assets["bg1"], 0.075),
-                (self.assets["bg4"], 0.2),
-            ]
-        )
-        self.beach_background = ParallaxBackground(
-            [
-                (self.assets["bg0"], 0.025),
-                (self.assets["bg1"], 0.075),
-                (self.assets["bg5"], 0.2),
-            ]
-        )
+        # the backgrounds of the map's background triggers, by name
+        self.backgrounds = {
+            "suburb": ParallaxBackground(
+                [
+                    (self.assets["bg0"], 0.025),
+                    (self.assets["bg1"], 0.075),
+                    (self.assets["bg2"], 0.15),
+                ]
+            ),
+            "downtown": ParallaxBackground(
+                [
+                    (self.assets["bg0"], 0.025),
+                    (self.assets["bg1"], 0.075),
+                    (self.assets["bg4"], 0.2),
+                ]
+            ),
+            "beach": ParallaxBackground(
+                [
+                    (self.assets["bg0"], 0.025),
+                    (self.assets["bg1"], 0.075),
+                    (self.assets["bg5"], 0.2),
+                ]
+            ),
+        }
+        # the background is kept when the player's top left corner
+        # isn't in any area
+        self.triggers.on("background", TriggerEvents.STAY, self.update_background)
 
-        self.background = self.suburb_background
+        self.background = self.backgrounds["suburb"]
+        self.drawn_background = None
+        self.drawn_scroll = None
 
-    def update(self, event_info: EventInfo):
-        super().update(event_info)
+        self.scheduler.add("background", 10, draw=self.draw_background)
 
-        if self.player.rect.x <= 124.5 * 16:
-            self.background = self.suburb_background
-        elif self.player.rect.x <= 283 * 16 and self.player.rect.y > 4 * 16:
-            self.background = self.downtown_background
-        elif self.player.rect.x >= 283 * 16:
-            self.background = self.beach_background
-
-    def draw(self, screen: pygame.Surface, event_info: EventInfo):
-        super().draw(screen, event_info)
+    def update_background(self, trigger: Trigger):
+        # the player can overlap two areas at once,
+        # the one their top left corner is in decides
+        if trigger.rect.collidepoint(self.player.rect.topleft):
+            self.background = self.backgrounds[trigger.target.name]
 
+    def draw_background(self, screen: pygame.Surface, event_info: EventInfo):
+        self.camera.interpolate(event_info["interpolation"])
         self.background.draw(screen, self.camera.scroll)
 
+        # everything behind the entities only changes when the camera moves
+        if (
+            self.background is not self.drawn_background
+            or self.camera.scroll != self.drawn_scroll
+        ):
+            self.dirty_rects = None
+            self.drawn_background = self.background
+            self.drawn_scroll = self.camera.scroll.copy()
+
 
 class TileStage(BackgroundStage):
+    def __init__(self):
+        super().__init__()
+
+        self.scheduler.add("tiles", 20, draw=self.draw_tiles)
+
     def collisions(self, entity, event_info: EventInfo):
-        collidable_tiles = get_neighboring_tiles(
-            self.tilemap, 3, pixel_to_tile(entity.rect)
-        )
-        # for tile in collidable_tiles:
-        #     pygame.draw.rect(pygame.display.get_surface(), "red", tile, 1)
-        # pygame.draw.rect(pygame.display.get_surface(), "green", entity.rect, 1)
-
-        entity.rect.x += entity.vel.x * event_info["dt"]
-
-        for tile in collidable_tiles:
-            if entity.rect.colliderect(tile):
-                if entity.vel.x > 0:
-                    entity.rect.right = tile.left
-                elif entity.vel.x < 0:
-                    entity.rect.left = tile.right
-
-        entity.rect.y += entity.vel.y * event_info["dt"]
-
-        for tile in collidable_tiles:
-            if entity.rect.colliderect(tile):
-                if entity.vel.y > 0:
-                    entity.rect.bottom = tile.top
-                    entity.jumping = False
-                    entity.vel.y = 0
-                elif entity.vel.y < 0:
-                    entity.rect.top = tile.bottom
-                    entity.vel.y = 0
+        grid = self.tilemap.collision_grid
+
+        grid.move_x(entity.rect, entity.vel.x * event_info["dt"])
+
+        if grid.move_y(entity.rect, entity.vel.y * event_info["dt"]):
+            if entity.vel.y > 0:
+                entity.jumping = False
+            entity.vel.y = 0
 
         # disables mid-air jumps
         if entity.vel.y > 0:
             entity.jumping = True
 
-    def update(self, event_info: EventInfo):
-        super().update(event_info)
-
-    def draw(self, screen: pygame.Surface, event_info: EventInfo):
-        super().draw(screen, event_info)
-
-        screen.blit(self.map, -self.camera.scroll)
+    def draw_tiles(self, screen: pygame.Surface, event_info: EventInfo):
+        self.tilemap.draw(screen, self.camera)
 
 
 class NPCStage(TileStage):
@@ -137,82 +200,134 @@ class NPCStage(TileStage):
         super().__init__()
 
         self.npcs = set()
+        # NPCs don't move, so they're only indexed once
+        self.npc_index = SpatialIndex(int(WIDTH))
         npc_types = {
             "talking_npc": TalkingNPC,
             "quest_giver_npc": QuestGiverNPC,
             "quest_receiver_npc": QuestReceiverNPC,
             "item_npc": ItemNPC,
         }
-        for obj in self.tilemap.tilemap.get_layer_by_name("npcs"):
+        for obj in self.tilemap.get_objects("npcs"):
             npc_type = npc_types[obj.type]
-            self.npcs.add(npc_type(self.assets, obj))
+            npc = npc_type(self.assets, obj, self.player.inventory)
+            self.npcs.add(npc)
+            self.npc_index.insert(npc, npc.rect)
+            self.triggers.add("npc", npc.rect, npc)
+
+        self.triggers.on("npc", TriggerEvents.ENTER, self.enter_npc)
+        self.triggers.on("npc", TriggerEvents.EXIT, self.exit_npc)
+
+        # the region is bigger than the screen, so NPCs whose text
+        # sticks out into the screen are never drawn asleep
+        self.activation = ActivationRegion(
+            self.npc_index,
+            TalkingNPC.TEXT_WRAPLENGTH // 2 + TILE_SIZE,
+            lambda npc: npc.sleep(),
+        )
 
-    def update(self, event_info: EventInfo):
-        super().update(event_info)
+        # all the walking NPCs move together, so they aren't indexed
+        self.walkers = WalkingNPCs(
+            self.assets,
+            self.tilemap.get_objects("walkers"),
+            self.tilemap.collision_grid,
+        )
+
+        self.scheduler.add("npcs", 30, self.update_npcs, self.draw_npcs)
+
+    def enter_npc(self, trigger: Trigger):
+        trigger.target.interacting = True
 
-        for npc in self.npcs:
+    def exit_npc(self, trigger: Trigger):
+        trigger.target.interacting = False
+
+    def update_npcs(self, event_info: EventInfo):
+        # NPCs far from the camera are asleep and aren't updated
+        for npc in self.activation.update(self.camera.view_rect):
             npc.update(event_info, self.player)
 
-    def draw(self, screen: pygame.Surface, event_info: EventInfo):
-        super().draw(screen, event_info)
+        self.walkers.update(event_info, self.activation.area)
+
+    def draw_npcs(self, screen: pygame.Surface, event_info: EventInfo):
+        # the NPCs' text can stick out of their rects
+        view = self.camera.view_rect
+        for npc in self.npc_index.query(view.inflate(TalkingNPC.TEXT_WRAPLENGTH, 0)):
+            if not npc.get_draw_rect().colliderect(view):
+                continue
 
-        for npc in self.npcs:
-            npc.draw(screen, self.camera, event_info)
+            npc.draw(self.draw_list, self.camera, event_info)
+            self.mark_dirty(self.camera.apply_rect(npc.get_draw_rect()))
+
+        for rect in self.walkers.draw(self.draw_list, self.camera, event_info):
+            self.mark_dirty(self.camera.apply_rect(rect).inflate(2, 2))
 
 
 class PlayerStage(NPCStage):
-    def update(self, event_info: EventInfo):
-        self.player.new_quest = False
-        super().update(event_info)
-        super().collisions(self.player, event_info)
+    def __init__(self):
+        super().__init__()
+
+        self.scheduler.add("player", 40, self.update_player, self.draw_player)
+
+    def update_player(self, event_info: EventInfo):
+        self.player.previous_pos.update(self.player.rect.topleft)
+        self.collisions(self.player, event_info)
 
         self.player.update(event_info)
         if not self.player.alive:
-            self._next_state = GameStates.GAME
+            self.respawning = True
 
-    def draw(self, screen: pygame.Surface, event_info: EventInfo):
-        super().draw(screen, event_info)
+        self.triggers.update(self.player.rect)
 
-        self.player.draw(screen, self.camera, event_info)
+    def respawn(self):
+        super().respawn()
+
+        self.player.respawn()
+
+    def draw_player(self, screen: pygame.Surface, event_info: EventInfo):
+        self.player.draw(self.draw_list, self.camera, event_info)
+        # inflated because the player's position isn't an integer
+        rect = self.player.get_draw_rect(event_info["interpolation"])
+        self.mark_dirty(self.camera.apply_rect(rect).inflate(2, 2))
 
 
 class CheckpointStage(PlayerStage):
     def __init__(self):
         super().__init__()
 
-        self.checkpoints = []
-        for obj in self.tilemap.tilemap.get_layer_by_name("checkpoints"):
-            self.checkpoints.append(pygame.Rect(obj.x, obj.y, obj.width, obj.height))
+        self.triggers.add_objects(self.tilemap.get_objects("checkpoints"))
+        self.triggers.on("checkpoint", TriggerEvents.STAY, self.reach_checkpoint)
 
-    def update(self, event_info: EventInfo):
-        super().update(event_info)
-
-        for checkpoint in self.checkpoints:
-            if checkpoint.colliderect(self.player.rect):
-                # using checkpoint.x instead of self.player.rect.x
-                # because if we do the latter the player would spawn
-                # at an edge of a tile, which isn't ideal
-                self.player.settings["checkpoint_pos"] = (
-                    checkpoint.x,
-                    self.player.rect.y,
-                )
+    def reach_checkpoint(self, trigger: Trigger):
+        # using checkpoint.x instead of self.player.rect.x
+        # because if we do the latter the player would spawn
+        # at an edge of a tile, which isn't ideal
+        self.player.settings["checkpoint_pos"] = (
+            trigger.rect.x,
+            self.player.rect.y,
+        )
 
 
 class CameraStage(CheckpointStage):
-    def update(self, event_info: EventInfo):
-        super().update(event_info)
+    def __init__(self):
+        super().__init__()
+
+        self.scheduler.add("camera", 50, self.update_camera)
 
+    def update_camera(self, event_info: EventInfo):
         self.camera.adjust_to(event_info["dt"], self.player.rect)
 
+    def respawn(self):
+        super().respawn()
+
+        self.camera.snap_to(self.player.rect)
+
 
 class UIStage(CameraStage):
     def __init__(self):
         super().__init__()
 
-        self.text_particles = []
-
         self.seashell_icon = self.assets["seashell"]
-        self.seashell_font = pygame.Font(FONT_PATH, 8)
+        self.seashell_font = get_font()
         self.last_amount = self.player.settings["seashells"]
         self.seashell_text = render_outline_text(
             str(self.last_amount), self.seashell_font, "white"
@@ -255,9 +370,32 @@ class UIStage(CameraStage):
         bottomright = (WIDTH - 2, HEIGHT)
         self.congrats_pos = self.congrats_surf.get_rect(bottomright=bottomright).topleft
 
-    def update(self, event_info: EventInfo):
-        super().update(event_info)
+        # the notifications fade out on their own, see notify
+        self.notifications = ParticlePool(
+            (
+                self.new_quest_surf,
+                self.quest_finished_surf,
+                self.no_seashells_surf,
+                self.congrats_surf,
+            ),
+            8,
+        )
+
+        self.scheduler.add("ui", 60, self.update_ui, self.draw_ui)
+
+    def notify(self, surf: pygame.Surface, pos: Position, alpha_speed: float = 3):
+        """
+        Shows a notification that fades out
 
+        Parameters:
+            surf: one of the notification surfaces
+            pos: where to show it, on the screen
+            alpha_speed: how fast it fades out
+        """
+        image = self.notifications.images.index(surf)
+        self.notifications.emit(pos, image=image, alpha=230, alpha_speed=alpha_speed)
+
+    def update_ui(self, event_info: EventInfo):
         amount = self.player.settings["seashells"]
         # if the amount of seashells changed
         # this is done so that we don't render text every frame
@@ -267,32 +405,29 @@ class UIStage(CameraStage):
             )
             self.last_amount = amount
 
-            self.text_particles.append(
-                FadingOutText(
-                    self.quest_finished_surf.copy(), self.quest_finished_pos, 3, 230
-                )
-            )
+            self.notify(self.quest_finished_surf, self.quest_finished_pos)
 
         # quest notifications
         if self.player.new_quest:
-            self.text_particles.append(
-                FadingOutText(self.new_quest_surf.copy(), self.new_quest_pos, 3, 230)
-            )
+            self.player.new_quest = False
+            self.notify(self.new_quest_surf, self.new_quest_pos)
 
-        for particle in self.text_particles:
-            particle.update(event_info["dt"])
+        self.notifications.update(event_info["dt"])
 
-    def draw(self, screen: pygame.Surface, event_info: EventInfo):
-        super().draw(screen, event_info)
+    def respawn(self):
+        super().respawn()
 
-        screen.blit(self.seashell_icon, self.seashell_icon_pos)
-        screen.blit(self.seashell_text, self.seashell_text_pos)
+        self.notifications.clear()
 
-        for particle in self.text_particles:
-            particle.draw(screen)
+    def draw_ui(self, screen: pygame.Surface, event_info: EventInfo):
+        self.draw_list.submit(self.seashell_icon, self.seashell_icon_pos, DrawLayers.UI)
+        self.draw_list.submit(self.seashell_text, self.seashell_text_pos, DrawLayers.UI)
+        self.mark_dirty(self.seashell_text_pos)
 
-            if not particle.alive:
-                self.text_particles.remove(particle)
+        self.notifications.draw(self.draw_list, DrawLayers.UI)
+        rect = self.notifications.get_bounding_rect()
+        if rect is not None:
+            self.mark_dirty(rect)
 
 
 class BeachStage(UIStage):
@@ -301,50 +436,86 @@ class BeachStage(UIStage):
 
         self.player_congratulated = False
 
-    def update(self, event_info: EventInfo):
-        super().update(event_info)
+        # confetti for when the player makes it to the beach
+        confetti = []
+        for color in ("#e43b44", "#feae34", "#63c74d", "#0099db", "#b55088"):
+            piece = pygame.Surface((2, 2))
+            piece.fill(color)
+            confetti.append(piece)
+        self.confetti = ParticlePool(confetti, 512, gravity=2)
+        self.rng = np.random.default_rng()
 
-        if (
-            self.player.rect.x > 290 * 16
-            and self.player.settings["seashells"] < 5
-            and self.player.vel.x > 0
-        ):
+        # the gate to the beach only lets players with enough seashells through
+        self.triggers.on("beach_gate", TriggerEvents.STAY, self.block_gate)
+        self.triggers.on("beach_gate", TriggerEvents.ENTER, self.pass_gate)
+
+        self.scheduler.add("beach", 70, self.update_beach, self.draw_beach)
+
+    def block_gate(self, trigger: Trigger):
+        if self.player.settings["seashells"] < 5 and self.player.vel.x > 0:
             self.player.vel.x = 0
 
-            if len(self.text_particles) < 3:
-                self.text_particles.append(
-                    FadingOutText(
-                        self.no_seashells_surf.copy(), self.no_seashells_pos, 5, 230
-                    )
-                )
-        elif (
-            int(self.player.rect.x) == 290 * 16
-            and self.player.settings["seashells"] >= 5
-            and not self.player_congratulated
-        ):
+            if len(self.notifications) < 3:
+                self.notify(self.no_seashells_surf, self.no_seashells_pos, 5)
+
+    def pass_gate(self, trigger: Trigger):
+        if self.player.settings["seashells"] >= 5 and not self.player_congratulated:
             self.player_congratulated = True
-            self.text_particles.append(
-                FadingOutText(self.congrats_surf.copy(), self.congrats_pos, 3, 230)
+            self.notify(self.congrats_surf, self.congrats_pos)
+
+            count = 400
+            self.confetti.emit(
+                self.player.rect.midtop,
+                self.rng.uniform((-6, -16), (6, -8), (count, 2)),
+                self.rng.integers(0, len(self.confetti.images), count),
+                255,
+                self.rng.uniform(8, 16, count),
             )
 
             # end the game!!
             self._next_state = GameStates.CREDITS
             self.transition.fade_speed /= 10
 
-            with open(DATA_PATH, "w") as f:
-                settings = json.dumps(
-                    {
-                        "run_intro": False,
-                        "game_complete": True,
-                    },
-                    indent=4,
-                )
-                f.write(settings)
+            store.save(DATA_PATH, {"run_intro": False, "game_complete": True})
+
+            music.fadeout(11000)
+
+    def update_beach(self, event_info: EventInfo):
+        self.confetti.update(event_info["dt"])
+
+    def draw_beach(self, screen: pygame.Surface, event_info: EventInfo):
+        scroll = self.camera.scroll
+        self.confetti.draw(self.draw_list, DrawLayers.PARTICLES, scroll)
+        rect = self.confetti.get_bounding_rect(scroll)
+        if rect is not None:
+            self.mark_dirty(rect)
+
+
+class DrawListStage(BeachStage):
+    def __init__(self):
+        super().__init__()
+
+        self.scheduler.add("draw_list", 80, draw=self.flush_draw_list)
+
+    def flush_draw_list(self, screen: pygame.Surface, event_info: EventInfo):
+        # draws everything the previous systems submitted
+        self.draw_list.flush(screen)
 
-            pygame.mixer.music.fadeout(11000)
 
+class PauseStage(DrawListStage):
+    # the systems that are stopped while the game is paused
+    WORLD_SYSTEMS = (
+        "frame",
+        "background",
+        "tiles",
+        "npcs",
+        "player",
+        "camera",
+        "ui",
+        "beach",
+        "draw_list",
+    )
 
-class PauseStage(BeachStage):
     def __init__(self):
         super().__init__()
 
@@ -374,16 +545,23 @@ class PauseStage(BeachStage):
             for i, text in enumerate(button_texts)
         ]
 
-    def update(self, event_info: EventInfo):
-        if not self.pause_active:
-            super().update(event_info)
+        self.scheduler.add("pause", 90, self.update_pause, self.draw_pause)
+
+    def set_paused(self, paused: bool):
+        self.pause_active = paused
+        for name in self.WORLD_SYSTEMS:
+            self.scheduler.set_enabled(name, update=not paused)
+
+        if not paused:
+            for name in self.WORLD_SYSTEMS:
+                self.scheduler.set_enabled(name, draw=True)
+            self.last_frame = None
+            # the world has to be redrawn completely after unpausing
+            self.full_redraw = True
 
-        for event in event_info["events"]:
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    self.pause_active = not self.pause_active
-                    if not self.pause_active:
-                        self.last_frame = None
+    def update_pause(self, event_info: EventInfo):
+        if event_info["input"].pressed("pause"):
+            self.set_paused(not self.pause_active)
 
         if self.pause_active:
             for button in self.buttons:
@@ -393,84 +571,90 @@ class PauseStage(BeachStage):
                     if button.text == "save & exit":
                         self.exit = True
                     elif button.text == "continue":
-                        self.pause_active = False
-                        self.last_frame = None
+                        self.set_paused(False)
                     elif button.text == "main menu":
                         self._next_state = GameStates.MENU
 
-    def draw(self, screen: pygame.Surface, event_info: EventInfo):
-        super().draw(screen, event_info)
+    def draw_pause(self, screen: pygame.Surface, event_info: EventInfo):
+        if not self.pause_active:
+            return
+
+        if self.last_frame is None:
+            # the world systems drew this frame one last time
+            self.last_frame = screen.copy()
+            for name in self.WORLD_SYSTEMS:
+                self.scheduler.set_enabled(name, draw=False)
+        # the paused frame is static, only the buttons change
+        # (unless the screen is fading out)
+        elif not self.transition.alpha:
+            self.dirty_rects = []
+            for button in self.buttons:
+                if button.state != button.drawn_state:
+                    button.draw(screen)
+                    self.mark_dirty(button.rect)
+            return
 
-        if self.pause_active:
-            if self.last_frame is None:
-                self.last_frame = screen.copy()
+        screen.blit(self.last_frame, (0, 0))
+        screen.blit(self.darkener, (0, 0))
 
-            screen.blit(self.last_frame, (0, 0))
-            screen.blit(self.darkener, (0, 0))
+        for button in self.buttons:
+            button.draw(screen)
 
-            for button in self.buttons:
-                button.draw(screen)
+        self.dirty_rects = None
 
 
 class OSTStage(PauseStage):
-    def __init__(self, ost_pos: float):
+    def __init__(self):
         super().__init__()
 
-        self.ost = self.assets["ost"]
-        self.ost_pos = ost_pos
-        self.start_ost(self.ost)
-        pygame.mixer.music.set_volume(0.4)
-
-    def start_ost(self, ost):
-        pygame.mixer.music.stop()
-        pygame.mixer.music.unload()
-        pygame.mixer.music.load(ost)
-        pygame.mixer.music.play(-1)
-        pygame.mixer.music.rewind()
-        pygame.mixer.music.set_pos(self.ost_pos / 1000)
-
-    def update(self, event_info: EventInfo):
-        super().update(event_info)
+        # keeps playing from where the menu or the last game left it
+        music.play(
+            {"ost": self.assets["ost"], "ost_quiet": self.assets["ost_quiet"]},
+            {"ost": 0.4},
+        )
 
-        if self.pause_active and self.ost == self.assets["ost"]:
-            self.ost = self.assets["ost_quiet"]
-            self.ost_pos += pygame.mixer.music.get_pos()
-            self.start_ost(self.ost)
-            pygame.mixer.music.set_volume(0.7)
+        self.scheduler.add("music", 100, self.update_music)
 
-        elif not self.pause_active and self.ost == self.assets["ost_quiet"]:
-            self.ost = self.assets["ost"]
-            self.ost_pos += pygame.mixer.music.get_pos()
-            self.start_ost(self.ost)
-            pygame.mixer.music.set_volume(0.4)
+    def update_music(self, event_info: EventInfo):
+        if self.pause_active:
+            music.mix({"ost_quiet": 0.7})
+        else:
+            music.mix({"ost": 0.4})
+        music.update(event_info["dt"])
 
 
 class TransitionStage(OSTStage):
-    def __init__(self, ost_pos: float):
-        super().__init__(ost_pos)
+    def __init__(self):
+        super().__init__()
 
         self.transition = FadeTransition(True, FADE_SPEED, (WIDTH, HEIGHT))
 
-    def update(self, event_info: EventInfo):
-        super().update(event_info)
+        self.scheduler.add(
+            "transition", 110, self.update_transition, self.draw_transition
+        )
 
+    def update_transition(self, event_info: EventInfo):
         self.transition.update(event_info["dt"])
         if self._next_state is not None:
             self.transition.fade_in = False
             if self.transition.event:
                 self.save()
-
-                # get last ost position
-                self.ost_pos += pygame.mixer.music.get_pos()
-                pygame.mixer.music.stop()
-                pygame.mixer.music.unload()
-
                 self.next_state = self._next_state
+        elif self.respawning:
+            self.transition.fade_in = False
+            if self.transition.event:
+                self.save()
+                self.respawn()
 
-    def draw(self, screen: pygame.Surface, event_info: EventInfo):
-        super().draw(screen, event_info)
+    def respawn(self):
+        super().respawn()
+
+        self.transition.fade_in = True
 
+    def draw_transition(self, screen: pygame.Surface, event_info: EventInfo):
         self.transition.draw(screen)
+        if self.transition.alpha:
+            self.dirty_rects = None
 
 
 class GameState(TransitionStage):
@@ -1,21 +1,19 @@
-import json
-
 import pygame
 
 from engine._types import EventInfo
 from engine.animations import FadeTransition
-from engine.asset_loader import load_assets
+from engine.asset_loader import load_assets, preload_assets
 from engine.background import ParallaxBackground
 from engine.button import Button
 from engine.enums import GameStates
+from engine.music import music
+from engine.prefetch import prefetcher
+from engine.store import store
 from src.common import DATA_PATH, FADE_SPEED, HEIGHT, SAVE_PATH, WIDTH
 
-pygame.font.init()
-pygame.mixer.init()
-
 
 class MenuInit:
-    def __init__(self, ost_pos: float):
+    def __init__(self):
         self.assets = load_assets("menu")
         # triggers the state switch
         self.next_state = None
@@ -24,7 +22,15 @@ class MenuInit:
         self._next_state = None
         self.exit = False
 
-        self.ost_pos = ost_pos
+        # the background scrolls constantly, so the whole screen changes
+        self.dirty_rects = None
+
+    @staticmethod
+    def prefetch() -> None:
+        """
+        Starts loading what the state needs in the background
+        """
+        prefetcher.submit(("assets", "menu"), preload_assets, "menu")
 
     def update(self, event_info: EventInfo):
         pass
@@ -34,15 +40,14 @@ class MenuInit:
 
 
 class BackgroundStage(MenuInit):
-    def __init__(self, ost_pos: float):
-        super().__init__(ost_pos)
+    def __init__(self):
+        super().__init__()
 
-        with open(DATA_PATH, "r") as f:
-            data = json.loads(f.read())
-            if data["game_complete"]:
-                special_layer = self.assets["bg5"]
-            else:
-                special_layer = self.assets["bg2"]
+        data = store.load(DATA_PATH)
+        if data["game_complete"]:
+            special_layer = self.assets["bg5"]
+        else:
+            special_layer = self.assets["bg2"]
 
         self.background = ParallaxBackground(
             [
@@ -69,8 +74,8 @@ class BackgroundStage(MenuInit):
 
 
 class ButtonStage(BackgroundStage):
-    def __init__(self, ost_pos: float):
-        super().__init__(ost_pos)
+    def __init__(self):
+        super().__init__()
 
         button_colors = {
             "static": (109, 117, 141),
@@ -102,25 +107,20 @@ class ButtonStage(BackgroundStage):
                 if button.text == "exit":
                     self.exit = True
                 elif button.text == "play":
-                    with open(DATA_PATH, "r") as file:
-                        settings = json.loads(file.read())
-                        if settings["run_intro"]:
-                            self._next_state = GameStates.INTRO
-                        else:
-                            self._next_state = GameStates.GAME
-                        self.ost_pos += pygame.mixer.music.get_pos()
+                    if store.load(DATA_PATH)["run_intro"]:
+                        self._next_state = GameStates.INTRO
+                    else:
+                        self._next_state = GameStates.GAME
                 elif button.text == "reset":
-                    with open(SAVE_PATH, "w") as file:
-                        settings = {
-                            "inventory": [],
-                            "checkpoint_pos": [0, 129.0],
-                            "items_delivered": [],
-                            "seashells": 0,
-                        }
-                        file.write(json.dumps(settings, indent=4))
-                    with open(DATA_PATH, "w") as file:
-                        data = {"run_intro": True, "game_complete": False}
-                        file.write(json.dumps(data, indent=4))
+                    settings = {
+                        "inventory": [],
+                        "checkpoint_pos": [0, 129.0],
+                        "items_delivered": [],
+                        "seashells": 0,
+                    }
+                    store.save(SAVE_PATH, settings)
+                    data = {"run_intro": True, "game_complete": False}
+                    store.save(DATA_PATH, data)
 
     def draw(self, screen: pygame.Surface, event_info: EventInfo):
         super().draw(screen, event_info)
@@ -130,22 +130,24 @@ class ButtonStage(BackgroundStage):
 
 
 class OSTStage(ButtonStage):
-    def __init__(self, ost_pos: float):
-        super().__init__(ost_pos)
+    def __init__(self):
+        super().__init__()
 
-        self.ost = self.assets["ost_quiet"]
-        pygame.mixer.music.load(self.ost)
-        pygame.mixer.music.play(-1)
-        pygame.mixer.music.set_volume(0.7)
+        # keeps playing from where the game left it
+        music.play(
+            {"ost": self.assets["ost"], "ost_quiet": self.assets["ost_quiet"]},
+            {"ost_quiet": 0.7},
+        )
+
+    def update(self, event_info: EventInfo):
+        super().update(event_info)
 
-        # set the ost to the last position
-        pygame.mixer.music.rewind()
-        pygame.mixer.music.set_pos(self.ost_pos / 1000)
+        music.update(event_info["dt"])
 
 
 class TransitionStage(OSTStage):
-    def __init__(self, ost_pos: float):
-        super().__init__(ost_pos)
+    def __init__(self):
+        super().__init__()
 
         self.transition = FadeTransition(True, FADE_SPEED, (WIDTH, HEIGHT))
 
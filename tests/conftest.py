@@ -0,0 +1,32 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# the tests run without a window or an audio device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(scope="session")
+def display():
+    """
+    Opens a display in the repository's root, where the game loads its files from.
+    It stays open for the whole session, since fonts and assets are cached
+    for the whole process
+    """
+    import pygame
+
+    from src.common import HEIGHT, WIDTH
+
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    pygame.init()
+    yield pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.quit()
+    os.chdir(cwd)
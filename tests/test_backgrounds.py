@@ -0,0 +1,26 @@
+import pytest
+
+# (where the player walks, the x where the next area starts, the two areas)
+BOUNDARIES = [
+    (range(1900, 2080), 1992, "suburb", "downtown"),
+    (range(4440, 4620), 4528, "downtown", "beach"),
+]
+
+
+@pytest.mark.parametrize("xs, edge, before, after", BOUNDARIES)
+def test_background_follows_the_player_across_a_boundary(
+    display, xs, edge, before, after
+):
+    from src.states.game_state import GameState
+
+    state = GameState()
+    names = {id(background): name for name, background in state.backgrounds.items()}
+
+    # walks across the boundary and back, half a pixel at a time
+    steps = [x + 0.5 for x in xs]
+    for x in steps + steps[::-1]:
+        state.player.rect.topleft = (x, 100)
+        state.triggers.update(state.player.rect)
+
+        expected = before if x < edge else after
+        assert names[id(state.background)] == expected, f"x {x}"
@@ -0,0 +1,119 @@
+import json
+from pathlib import Path
+
+import pygame
+import pytest
+
+from engine.collision import ONE_WAY_HEIGHT, CollisionGrid
+from engine.map_compiler import EMPTY, ONE_WAY, SOLID
+
+# the player's position after every tick of scripted_input,
+# recorded before tile collisions moved to CollisionGrid
+PLAYER_PATH = Path(__file__).parent / "data" / "player_path.json"
+
+
+def make_grid(rows):
+    cells = bytearray(
+        {".": EMPTY, "#": SOLID, "-": ONE_WAY}[cell] for row in rows for cell in row
+    )
+    return CollisionGrid(cells, len(rows[0]), len(rows), 16, 16)
+
+
+def test_one_way_tiles_block_at_their_top():
+    grid = make_grid(
+        [
+            "....",
+            ".-..",
+            "....",
+        ]
+    )
+
+    # falling onto the strip
+    rect = pygame.FRect(16, 0, 14, 15)
+    assert grid.move_y(rect, 4)
+    assert rect.bottom == 16
+
+    # jumping into it from below
+    rect = pygame.FRect(16, 20, 14, 15)
+    assert grid.move_y(rect, -4)
+    assert rect.top == 16 + ONE_WAY_HEIGHT
+
+    # walking into its side
+    rect = pygame.FRect(0, 10, 14, 15)
+    assert grid.move_x(rect, 4)
+    assert rect.right == 16
+
+    # walking under it
+    rect = pygame.FRect(0, 20, 14, 15)
+    assert not grid.move_x(rect, 4)
+    assert rect.left == 4
+
+
+def test_solid_tiles_stop_at_the_closest_side():
+    grid = make_grid(
+        [
+            "....",
+            "..##",
+            "....",
+        ]
+    )
+
+    rect = pygame.FRect(16, 16, 14, 15)
+    assert grid.move_x(rect, 8)
+    assert rect.right == 32
+
+    rect = pygame.FRect(34, 40, 14, 8)
+    assert grid.move_y(rect, -12)
+    assert rect.top == 32
+
+
+class HeldKeys:
+    def __init__(self, keys):
+        self.keys = keys
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+
+def scripted_input(tick):
+    """
+    Returns the keys held and the events of a tick: walking right,
+    walking back left for a bit, and jumping every 45 ticks
+    """
+    held = {pygame.K_a} if 600 <= tick < 680 else {pygame.K_d}
+    events = []
+    if tick % 45 == 0:
+        events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+
+    return held, events
+
+
+def test_player_path_is_unchanged(display):
+    from engine.input import Input
+    from src.common import ACTIONS
+    from src.states.game_state import GameState
+
+    expected = json.loads(PLAYER_PATH.read_text())
+
+    state = GameState()
+    player = state.player
+    player.rect.topleft = (0, 129 - player.rect.height)
+    player.vel.update(0, 0)
+
+    controls = Input(ACTIONS)
+    for tick, (x, y) in enumerate(expected):
+        held, events = scripted_input(tick)
+        controls.update(events)
+        controls.held_keys = HeldKeys(held)
+        state.update(
+            {
+                "events": events,
+                "dt": 1 / 6,
+                "input": controls,
+                "mouse_pos": (0, 0),
+                "interpolation": 1.0,
+            }
+        )
+
+        assert player.rect.x == pytest.approx(x, abs=0.01), f"tick {tick}"
+        assert player.rect.y == pytest.approx(y, abs=0.01), f"tick {tick}"
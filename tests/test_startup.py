@@ -0,0 +1,69 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# how long importing the game may take, pygame itself takes most of it
+IMPORT_BUDGET = 0.5
+
+# imports the game in a fresh interpreter and reports what it did
+IMPORT_SCRIPT = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import src.game
+
+seconds = time.perf_counter() - start
+
+import pygame
+
+print(
+    json.dumps(
+        {
+            "seconds": seconds,
+            "modules": sorted(sys.modules),
+            "mixer": pygame.mixer.get_init() is not None,
+        }
+    )
+)
+"""
+
+
+def import_game() -> dict:
+    env = dict(os.environ, SDL_AUDIODRIVER="dummy", SDL_VIDEODRIVER="dummy")
+    env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_import_time_is_within_budget():
+    # the fastest of a few runs, so a busy machine doesn't fail the test
+    seconds = min(import_game()["seconds"] for _ in range(3))
+
+    assert seconds < IMPORT_BUDGET, (
+        f"importing the game took {seconds * 1000:.0f} ms,"
+        f" the budget is {IMPORT_BUDGET * 1000:.0f} ms"
+    )
+
+
+def test_import_is_lazy():
+    result = import_game()
+
+    # the map and the game state are only loaded once the game starts
+    assert "pytmx" not in result["modules"]
+    assert "src.states.game_state" not in result["modules"]
+    # the mixer starts when the first sound is loaded
+    assert not result["mixer"]
@@ -0,0 +1,33 @@
+import json
+import logging
+
+import pytest
+
+from engine.store import JSONStore
+
+
+def test_saves_are_written_on_flush(tmp_path):
+    store = JSONStore(delay=0)
+    path = tmp_path / "save.json"
+
+    store.save(str(path), {"seashells": 1})
+    store.save(str(path), {"seashells": 2})
+    store.flush()
+
+    assert json.loads(path.read_text()) == {"seashells": 2}
+    assert store.load(str(path)) == {"seashells": 2}
+
+
+def test_write_errors_are_logged_and_raised(tmp_path, caplog):
+    store = JSONStore(delay=0)
+    path = tmp_path / "missing" / "save.json"
+
+    with caplog.at_level(logging.ERROR, logger="engine.store"):
+        store.save(str(path), {"seashells": 1})
+        with pytest.raises(OSError, match="Couldn't save"):
+            store.flush()
+
+    assert str(path) in caplog.text
+    # the save is still kept in memory, and the error is only raised once
+    assert store.load(str(path)) == {"seashells": 1}
+    store.flush()